@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import USER_CLAIMS
+
+
+def _claim(attr, claim=None, to_python=None):
+    claim = claim or attr
+
+    def fget(self):
+        if self._wrapped is empty:
+            value = self._token[claim]
+            return to_python(value) if to_python else value
+        return getattr(self._wrapped, attr)
+    return property(fget)
+
+
+def _user_id(value):
+    # simplejwt stores the id as a string.
+    return get_user_model()._meta.get_field(api_settings.USER_ID_FIELD).to_python(value)
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    ``request.user`` built from access token claims. ``id``, ``pk``,
+    ``email``, ``is_seller`` and ``is_staff`` come from the token; touching
+    anything else (or saving, comparing, passing it to the ORM) loads the User
+    row once and proxies to it, like Django's own lazy ``request.user``.
+    """
+
+    id = _claim("id", api_settings.USER_ID_CLAIM, _user_id)
+    pk = _claim("pk", api_settings.USER_ID_CLAIM, _user_id)
+    email = _claim("email")
+    is_seller = _claim("is_seller")
+    is_staff = _claim("is_staff")
+    is_active = True  # tokens are never issued to inactive users
+    is_anonymous = False
+    is_authenticated = True
+
+    def __init__(self, token):
+        self.__dict__["_token"] = token
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: get_user_model().objects.get(**{api_settings.USER_ID_FIELD: user_id}))
+
+    def __bool__(self):
+        # Permission checks do ``request.user and ...``; don't load for that.
+        return True
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per-request User query. Claims are
+    refreshed whenever a new access token is issued, so a changed email or
+    role (or a deactivated account) takes effect within one access token
+    lifetime.
+    """
+
+    def get_user(self, validated_token):
+        claims = (api_settings.USER_ID_CLAIM, *USER_CLAIMS)
+        if not all(claim in validated_token for claim in claims):
+            # Issued before the claims were added (or malformed); let the
+            # stock class load or reject the user.
+            return super().get_user(validated_token)
+        return TokenUser(validated_token)
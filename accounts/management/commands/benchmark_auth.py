@@ -0,0 +1,78 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from accounts.tokens import UserClaimsRefreshToken
+from cart.models import Cart, CartItem
+from listings.models import Product
+from orders.models import Order, OrderItem
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Count queries per request on the cart and orders endpoints with a "
+        "plain simplejwt access token (User loaded from the database) and one "
+        "carrying user claims (token-backed user). Seed data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per endpoint for timing.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, repeat):
+        seller = User.objects.create_user(email="auth-bench-seller@example.com", password=None, is_seller=True)
+        buyer = User.objects.create_user(email="auth-bench-buyer@example.com", password=None)
+        products = Product.objects.bulk_create([
+            Product(seller=seller, name=f"Bench {i}", slug=f"auth-bench-{i}", price=10, stock=1000)
+            for i in range(5)
+        ])
+        cart = Cart.objects.create(user=buyer)
+        CartItem.objects.bulk_create([CartItem(cart=cart, product=p, quantity=1) for p in products])
+        order = Order.objects.create(user=buyer, total_price=50)
+        OrderItem.objects.bulk_create([OrderItem(order=order, product=p, quantity=1, price=10) for p in products])
+
+        tokens = {
+            "plain": RefreshToken.for_user(buyer).access_token,
+            "claims": UserClaimsRefreshToken.for_user(buyer).access_token,
+        }
+        requests = [
+            ("GET", "/api/cart/", None),
+            ("POST", "/api/cart/add/", {"product_id": products[0].pk, "quantity": 1}),
+            ("GET", "/api/orders/", None),
+            ("GET", f"/api/orders/{order.pk}/", None),
+            ("POST", "/api/orders/create/", {"items": [{"product_id": products[1].pk, "quantity": 1}]}),
+        ]
+
+        for method, path, payload in requests:
+            results = []
+            for name, token in tokens.items():
+                client = APIClient()
+                client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+                send = getattr(client, method.lower())
+                send(path, payload, format="json")  # warm caches (e.g. the cart id)
+
+                reset_queries()  # with DEBUG on, a full query log would hide new entries
+                with CaptureQueriesContext(connection) as queries:
+                    response = send(path, payload, format="json")
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    send(path, payload, format="json")
+                elapsed = (time.perf_counter() - started) / repeat
+                results.append(f"{name}: {len(queries)} queries, {elapsed * 1000:.1f} ms (HTTP {response.status_code})")
+            self.stdout.write(f"{method:<5}{path:<24}" + "  |  ".join(results))
@@ -1,6 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.db import transaction
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from cart.models import Cart
+from .tokens import UserClaimsRefreshToken, add_user_claims
 
 User = get_user_model()
 
@@ -12,7 +17,10 @@ class RegisterSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         password = validated_data.pop("password")
-        user = User.objects.create_user(password=password, **validated_data)
+        with transaction.atomic():
+            user = User.objects.create_user(password=password, **validated_data)
+            # Create the cart up front so cart requests never need to.
+            Cart.objects.create(user=user)
         return user
 
 
@@ -34,9 +42,26 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError("Invalid login credentials")
         if not user.is_active:
             raise serializers.ValidationError("User account is disabled.")
-        refresh = RefreshToken.for_user(user)
+        refresh = UserClaimsRefreshToken.for_user(user)
         return {
             "refresh": str(refresh),
             "access": str(refresh.access_token),
             "user": UserSerializer(user).data
         }
+
+
+class UserClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Issues access tokens with USER_CLAIMS read fresh from the database, so
+    role or email changes reach the token-backed request.user on refresh.
+    """
+    token_class = UserClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        return {"access": str(add_user_claims(refresh.access_token, user))}
@@ -1,3 +1,56 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from cart.models import Cart, CartItem
+from listings.models import Product
+from orders.models import Order, OrderItem
+from .authentication import ClaimsJWTAuthentication, TokenUser
+from .models import User
+from .tokens import UserClaimsRefreshToken
+
+
+class ClaimsAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = User.objects.create_user(email="buyer@example.com", password=None)
+        products = Product.objects.bulk_create([
+            Product(seller=cls.buyer, name=f"Lamp {i}", slug=f"lamp-{i}", price=10, stock=10) for i in range(5)
+        ])
+        cart = Cart.objects.create(user=cls.buyer)
+        CartItem.objects.bulk_create([CartItem(cart=cart, product=p, quantity=1) for p in products])
+        order = Order.objects.create(user=cls.buyer, total_price=50)
+        OrderItem.objects.bulk_create([OrderItem(order=order, product=p, quantity=1, price=10) for p in products])
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, token, path):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        client.get(path)  # warm caches (e.g. the cart id)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_claims_tokens_skip_the_user_query(self):
+        plain = RefreshToken.for_user(self.buyer).access_token
+        claims = UserClaimsRefreshToken.for_user(self.buyer).access_token
+        for path in (reverse("get-cart"), reverse("order-list")):
+            with self.subTest(path=path):
+                self.assertEqual(self.count_queries(claims, path), self.count_queries(plain, path) - 1)
+
+    def test_token_user_reads_claims_without_loading(self):
+        token = UserClaimsRefreshToken.for_user(self.buyer).access_token
+        user = ClaimsJWTAuthentication().get_user(token)
+        self.assertIsInstance(user, TokenUser)
+        with self.assertNumQueries(0):
+            self.assertEqual((user.pk, user.email, user.is_seller), (self.buyer.pk, self.buyer.email, False))
+            self.assertTrue(user and user.is_authenticated)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.date_joined, self.buyer.date_joined)
@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# User fields copied into every token so authentication needs no User query.
+USER_CLAIMS = ("email", "is_seller", "is_staff")
+
+
+def add_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class UserClaimsRefreshToken(RefreshToken):
+    """Refresh token carrying USER_CLAIMS; its access tokens inherit them."""
+
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from cart.models import Cart, CartItem
+from cart.serializers import CartSerializer
+from listings.models import Product, ProductImage
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare GET /api/cart/ with the full nested CartSerializer as the "
+        "cart grows. Seed data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[1, 50, 200])
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["sizes"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, sizes):
+        seller = User.objects.create_user(email="cart-bench-seller@example.com", password=None)
+        products = Product.objects.bulk_create([
+            Product(seller=seller, name=f"Bench {i}", slug=f"cart-bench-{i}", price=10, stock=100,
+                    description="x" * 2000)
+            for i in range(max(sizes))
+        ])
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image=f"product_images/bench-{product.pk}-{n}.jpg")
+            for product in products for n in range(3)
+        ])
+
+        for size in sizes:
+            buyer = User.objects.create_user(email=f"cart-bench-{size}@example.com", password=None)
+            cart = Cart.objects.create(user=buyer)
+            CartItem.objects.bulk_create([CartItem(cart=cart, product=p, quantity=2) for p in products[:size]])
+            client = APIClient()
+            client.force_authenticate(buyer)
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get("/api/cart/")
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{size:>5} items  GET /api/cart/: {len(queries)} queries, "
+                f"{elapsed * 1000:.1f} ms, {len(response.content)} bytes, subtotal {response.data['subtotal']}"
+            )
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                data = CartSerializer(Cart.objects.get(pk=cart.pk)).data
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{size:>5} items  CartSerializer: {len(queries)} queries, "
+                f"{elapsed * 1000:.1f} ms, {len(data['items'])} items"
+            )
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
-from listings.models import Product
+from django.db.models import CharField, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value, Window
+from django.db.models.functions import Coalesce
+from listings.models import Product, ProductImage, ProductVariant
 
 class Cart(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="cart")
@@ -9,14 +11,58 @@ class Cart(models.Model):
     def __str__(self):
         return f"Cart ({self.user.username})"
 
+class CartItemQuerySet(models.QuerySet):
+    def with_totals(self, image=True):
+        """
+        Everything the cart view renders in one SELECT: the product and variant
+        joined (without descriptions), the first image path, the unit price and
+        line total, and the whole cart's subtotal and item count via window
+        functions over the cart. ``image=False`` skips the image subquery.
+        """
+        money = DecimalField(max_digits=12, decimal_places=2)
+        first_image = ProductImage.objects.filter(product=OuterRef("product")).order_by("id").values("image")[:1]
+        return (
+            self.select_related("product", "variant")
+            .only(
+                "id", "cart_id", "quantity", "added_at",
+                "product__id", "product__name", "product__slug", "product__price", "product__stock",
+                "variant__id", "variant__product_id", "variant__name", "variant__price", "variant__stock",
+            )
+            .annotate(
+                unit_price=Coalesce("variant__price", "product__price", output_field=money),
+                image_path=Subquery(first_image) if image else Value(None, output_field=CharField()),
+            )
+            .annotate(line_total=ExpressionWrapper(F("unit_price") * F("quantity"), output_field=money))
+            .annotate(
+                cart_subtotal=Window(Sum("line_total"), partition_by=[F("cart_id")], output_field=money),
+                cart_quantity=Window(Sum("quantity"), partition_by=[F("cart_id")]),
+            )
+            .order_by("added_at", "id")
+        )
+
+
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, null=True, blank=True)
     quantity = models.PositiveIntegerField(default=1)
     added_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CartItemQuerySet.as_manager()
+
     class Meta:
-        unique_together = ("cart", "product")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cart", "product"],
+                condition=models.Q(variant__isnull=True),
+                name="cartitem_unique_product",
+            ),
+            models.UniqueConstraint(
+                fields=["cart", "product", "variant"],
+                condition=models.Q(variant__isnull=False),
+                name="cartitem_unique_variant",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.product.name} x {self.quantity}"
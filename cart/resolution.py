@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+from .models import Cart
+
+CART_CACHE_TIMEOUT = 300  # seconds
+
+
+def _cache_key(user_id):
+    return f"cart:user:{user_id}"
+
+
+def _cart_instance(user_id, cart_id, created_at):
+    cart = Cart(id=cart_id, user_id=user_id, created_at=created_at)
+    cart._state.adding = False
+    cart._state.db = "default"
+    return cart
+
+
+def resolve_cart(user):
+    """
+    Return the user's Cart without touching the database when its id is
+    cached. Users registered before carts were created at sign-up get one
+    lazily here.
+    """
+    if not user.is_authenticated:
+        return None
+    key = _cache_key(user.pk)
+    cached = cache.get(key)
+    if cached is not None:
+        return _cart_instance(user.pk, *cached)
+    cart, _ = Cart.objects.get_or_create(user_id=user.pk)
+    cache.set(key, (cart.id, cart.created_at), CART_CACHE_TIMEOUT)
+    return cart
+
+
+def forget_cart(user_id):
+    cache.delete(_cache_key(user_id))
+
+
+class CartMiddleware:
+    """
+    Adds a lazy ``request.cart``. It is resolved on first access, after DRF
+    has authenticated the user, and at most once per request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.cart = SimpleLazyObject(lambda: resolve_cart(request.user))
+        return self.get_response(request)
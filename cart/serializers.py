@@ -1,18 +1,87 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
+from marketplace.serializers import EagerLoadingMixin, SparseFieldsMixin
 from .models import Cart, CartItem
-from listings.serializers import ProductSerializer
+from listings.models import Product
+from listings.serializers import ProductSerializer, ProductVariantSerializer
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
-    product_id = serializers.PrimaryKeyRelatedField(queryset=None, write_only=True, source="product")
+    product_id = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all(), write_only=True, source="product")
+    expandable_fields = {"variant": (ProductVariantSerializer, {})}
 
     class Meta:
         model = CartItem
-        fields = ["id", "product", "product_id", "quantity", "added_at"]
+        fields = ["id", "product", "product_id", "variant", "quantity", "added_at"]
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
 
     class Meta:
         model = Cart
         fields = ["id", "user", "items", "created_at"]
+
+
+class CartOperationSerializer(serializers.Serializer):
+    """One line of a batch cart update; quantity 0 removes the line."""
+    product_id = serializers.IntegerField(min_value=1)
+    variant_id = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class CartProductSerializer(SparseFieldsMixin, serializers.Serializer):
+    """Slim product projection for cart lines: no description, one image."""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    slug = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    stock = serializers.IntegerField()
+
+
+class CartLineSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Reads a CartItem loaded with ``CartItem.objects.with_totals()``."""
+    product = CartProductSerializer(read_only=True)
+    variant = serializers.SerializerMethodField()
+    image = serializers.SerializerMethodField()
+    unit_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    expandable_fields = {"variant": (ProductVariantSerializer, {})}
+
+    class Meta:
+        model = CartItem
+        fields = ["id", "product", "variant", "image", "quantity", "unit_price", "line_total", "added_at"]
+
+    def get_variant(self, item):
+        if item.variant is None:
+            return None
+        return {"id": item.variant.id, "name": item.variant.name, "stock": item.variant.stock}
+
+    def get_image(self, item):
+        if not item.image_path:
+            return None
+        url = default_storage.url(item.image_path)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+def cart_summary(cart, items, context=None, fields=None, expand=None):
+    """
+    Cart payload from ``with_totals()`` rows; the totals come from the
+    window annotations, so no extra aggregate query is needed. ``fields``
+    and ``expand`` (from ``parse_fields``) trim the payload and expand the
+    lines, e.g. ``items.variant``.
+    """
+    items = list(items)
+    fields = fields or {}
+    expand = expand or {}
+    money = serializers.DecimalField(max_digits=12, decimal_places=2)
+    summary = {
+        "id": lambda: cart.id,
+        "items": lambda: CartLineSerializer(
+            items, many=True, context=context, fields=fields.get("items"), expand=expand.get("items")
+        ).data,
+        "item_count": lambda: items[0].cart_quantity if items else 0,
+        "subtotal": lambda: money.to_representation(items[0].cart_subtotal if items else 0),
+        "created_at": lambda: serializers.DateTimeField().to_representation(cart.created_at),
+    }
+    return {key: render() for key, render in summary.items() if not fields or key in fields}
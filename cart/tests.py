@@ -1,3 +1,184 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.serializers import RegisterSerializer
+from listings.models import Product, ProductImage, ProductVariant
+from .models import Cart, CartItem
+from .resolution import CartMiddleware, resolve_cart
+
+
+class CartQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seller = User.objects.create_user(email="seller@example.com", password=None, is_seller=True)
+        cls.products = Product.objects.bulk_create([
+            Product(seller=seller, name=f"Lamp {i}", slug=f"lamp-{i}", price=10, stock=100, description="x" * 500)
+            for i in range(50)
+        ])
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image=f"product_images/lamp-{product.pk}-{n}.jpg")
+            for product in cls.products for n in range(2)
+        ])
+        cls.variants = ProductVariant.objects.bulk_create([
+            ProductVariant(product=product, name="Red", price=12, stock=100) for product in cls.products
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def client_with_cart(self, size):
+        buyer = User.objects.create_user(email=f"buyer-{size}@example.com", password=None)
+        cart = Cart.objects.create(user=buyer)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product=product, variant=variant if i % 2 else None, quantity=2)
+            for i, (product, variant) in enumerate(zip(self.products[:size], self.variants))
+        ])
+        client = APIClient()
+        client.force_authenticate(buyer)
+        client.get(reverse("get-cart"))  # resolves and caches the cart id
+        return client
+
+    def test_cart_queries_do_not_grow_with_items(self):
+        for size in (1, 50):
+            client = self.client_with_cart(size)
+            with self.subTest(size=size), self.assertNumQueries(1):
+                response = client.get(reverse("get-cart"), {"expand": "items.variant"})
+            self.assertEqual(len(response.data["items"]), size)
+            self.assertEqual(response.data["item_count"], 2 * size)
+            self.assertTrue(response.data["items"][0]["image"])
+
+
+class BatchUpdateCartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seller = User.objects.create_user(email="seller@example.com", password=None, is_seller=True)
+        cls.lamp = Product.objects.create(seller=seller, name="Lamp", price=10, stock=100)
+        cls.chair = Product.objects.create(seller=seller, name="Chair", price=20, stock=100)
+        cls.red = ProductVariant.objects.create(product=cls.lamp, name="Red", price=12, stock=100)
+        cls.buyer = User.objects.create_user(email="buyer@example.com", password=None)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def batch(self, items, mode=None):
+        payload = {"items": items} if mode is None else {"items": items, "mode": mode}
+        return self.client.post(reverse("batch-update-cart"), payload, format="json")
+
+    def lines(self):
+        return dict(
+            ((item.product_id, item.variant_id), item.quantity)
+            for item in CartItem.objects.filter(cart__user=self.buyer)
+        )
+
+    def test_set_mode_replaces_quantities(self):
+        self.batch([{"product_id": self.lamp.pk, "quantity": 2}])
+        response = self.batch([
+            {"product_id": self.lamp.pk, "quantity": 5},
+            {"product_id": self.lamp.pk, "variant_id": self.red.pk, "quantity": 1},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.lines(), {(self.lamp.pk, None): 5, (self.lamp.pk, self.red.pk): 1})
+        self.assertEqual(response.data["item_count"], 6)
+        self.assertEqual(response.data["subtotal"], "62.00")
+
+    def test_add_mode_adds_to_existing_lines(self):
+        self.batch([{"product_id": self.lamp.pk, "quantity": 2}])
+        self.batch([
+            {"product_id": self.lamp.pk, "quantity": 3},
+            {"product_id": self.chair.pk, "quantity": 1},
+            {"product_id": self.chair.pk, "quantity": 1},
+        ], mode="add")
+        self.assertEqual(self.lines(), {(self.lamp.pk, None): 5, (self.chair.pk, None): 2})
+
+    def test_zero_quantity_removes_the_line(self):
+        self.batch([
+            {"product_id": self.lamp.pk, "quantity": 2},
+            {"product_id": self.lamp.pk, "variant_id": self.red.pk, "quantity": 2},
+        ])
+        self.batch([{"product_id": self.lamp.pk, "variant_id": self.red.pk, "quantity": 0}])
+        self.assertEqual(self.lines(), {(self.lamp.pk, None): 2})
+        self.batch([{"product_id": self.lamp.pk, "quantity": -2}], mode="add")
+        self.assertEqual(self.lines(), {(self.lamp.pk, None): 2})  # negative quantities are invalid
+        self.batch([{"product_id": self.lamp.pk, "quantity": 0}])
+        self.assertEqual(self.lines(), {})
+
+    def test_invalid_batches_are_rejected(self):
+        for items, mode in (
+            ([{"product_id": 999999, "quantity": 1}], None),
+            ([{"product_id": self.chair.pk, "variant_id": self.red.pk, "quantity": 1}], None),
+            ([{"product_id": self.lamp.pk, "quantity": -1}], None),
+            ([{"product_id": self.lamp.pk, "quantity": 1}], "replace"),
+        ):
+            with self.subTest(items=items, mode=mode):
+                self.assertEqual(self.batch(items, mode).status_code, 400)
+        self.assertEqual(self.lines(), {})
+
+    def test_retries_when_a_concurrent_batch_created_the_line(self):
+        bulk_create = CartItem.objects.bulk_create
+        calls = []
+
+        def conflict_once(objs, *args, **kwargs):
+            calls.append(objs)
+            if len(calls) == 1:
+                raise IntegrityError("UNIQUE constraint failed: cartitem_unique_product")
+            return bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(CartItem.objects, "bulk_create", side_effect=conflict_once):
+            response = self.batch([{"product_id": self.lamp.pk, "quantity": 2}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.lines(), {(self.lamp.pk, None): 2})
+
+
+class CartResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="buyer@example.com", password=None)
+
+    def test_register_creates_the_cart(self):
+        serializer = RegisterSerializer(data={"email": "new@example.com", "password": "secret123"})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        user = serializer.save()
+        self.assertTrue(Cart.objects.filter(user=user).exists())
+
+    def test_cache_miss_loads_or_creates_then_hit_skips_the_database(self):
+        cart = resolve_cart(self.user)  # no cart yet: created lazily
+        self.assertEqual(Cart.objects.get(user=self.user).pk, cart.pk)
+        cache.clear()
+        with self.assertNumQueries(1):  # miss with an existing cart: one SELECT
+            self.assertEqual(resolve_cart(self.user).pk, cart.pk)
+
+        with self.assertNumQueries(0):
+            cached = resolve_cart(self.user)
+        self.assertEqual((cached.pk, cached.user_id, cached.created_at), (cart.pk, self.user.pk, cart.created_at))
+
+        # A cached instance behaves like a loaded one for saves and relations.
+        CartItem.objects.create(cart=cached, product=Product.objects.create(seller=self.user, name="Lamp", price=1))
+        self.assertEqual(cart.items.count(), 1)
+
+    def test_deleting_the_cart_forgets_the_cached_id(self):
+        cart = resolve_cart(self.user)
+        cart.delete()
+        replacement = resolve_cart(self.user)
+        self.assertNotEqual(replacement.pk, cart.pk)
+        self.assertTrue(Cart.objects.filter(pk=replacement.pk).exists())
+
+    def test_request_cart_is_lazy_and_resolved_once(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        with self.assertNumQueries(0):
+            CartMiddleware(lambda request: None)(request)
+
+        resolve_cart(self.user)  # fill the cache
+        with mock.patch("cart.resolution.resolve_cart", wraps=resolve_cart) as resolve:
+            CartMiddleware(lambda request: (request.cart.id, request.cart.id))(request)
+            self.assertEqual(resolve.call_count, 1)
+        self.assertEqual(request.cart.user_id, self.user.pk)
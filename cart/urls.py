@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path("", views.get_cart, name="get-cart"),                       # GET user cart
     path("add/", views.add_to_cart, name="add-to-cart"),             # POST add item
+    path("batch/", views.batch_update_cart, name="batch-update-cart"), # POST add/update/remove many items
     path("item/<int:item_id>/update/", views.update_cart_item, name="update-cart-item"), # PUT
     path("item/<int:item_id>/remove/", views.remove_cart_item, name="remove-cart-item"), # DELETE
     path("clear/", views.clear_cart, name="clear-cart"),             # DELETE all cart items
@@ -3,21 +3,32 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from .models import Cart, CartItem
-from listings.models import Product
-from .serializers import CartSerializer, CartItemSerializer
-from orders.models import Order, OrderItem 
-from django.conf import settings
-import requests
+from django.db import IntegrityError, transaction
+from .models import CartItem
+from listings.models import Product, ProductVariant
+from listings.stock import InsufficientStock
+from .serializers import CartItemSerializer, CartOperationSerializer, cart_summary
+from marketplace.serializers import is_requested, sparse_options
+from orders.models import Payment
+from orders.payments import PaymentGatewayError, get_paystack_client
+from orders.services import UnknownProducts, place_order, resolve_lines
 # ---------------------------
 # GET USER CART
 # ---------------------------
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_cart(request):
-    cart, _ = Cart.objects.get_or_create(user=request.user)
-    serializer = CartSerializer(cart)
-    return Response(serializer.data)
+    return cart_response(request, request.cart)
+
+
+def cart_response(request, cart):
+    """
+    The cart summary, trimmed by ?fields= (e.g. ?fields=item_count,subtotal)
+    and with ?expand=items.variant rendering full variants.
+    """
+    sparse = sparse_options(request)
+    items = CartItem.objects.filter(cart_id=cart.id).with_totals(image=is_requested(sparse["fields"], "items", "image"))
+    return Response(cart_summary(cart, items, {"request": request}, **sparse))
 
 # ---------------------------
 # ADD ITEM TO CART
@@ -25,35 +36,119 @@ def get_cart(request):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def add_to_cart(request):
-    cart, _ = Cart.objects.get_or_create(user=request.user)
+    cart = request.cart
     product_id = request.data.get("product_id")
     quantity = int(request.data.get("quantity", 1))
 
     product = get_object_or_404(Product, id=product_id)
+    variant = None
+    variant_id = request.data.get("variant_id")
+    if variant_id:
+        variant = get_object_or_404(ProductVariant, id=variant_id, product=product)
 
-    cart_item, created = CartItem.objects.get_or_create(cart=cart, product=product)
+    cart_item, created = CartItem.objects.get_or_create(cart_id=cart.id, product=product, variant=variant)
     if not created:
         cart_item.quantity += quantity
     else:
         cart_item.quantity = quantity
     cart_item.save()
 
-    serializer = CartItemSerializer(cart_item)
+    serializer = CartItemSerializer(cart_item, **sparse_options(request))
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+# ---------------------------
+# BATCH UPDATE CART
+# ---------------------------
+BATCH_RETRIES = 3
+
+
+def _apply_batch(cart_id, lines, mode):
+    """Write the batch's creates, updates and deletes in one transaction."""
+    with transaction.atomic():
+        existing = {
+            (item.product_id, item.variant_id): item
+            for item in CartItem.objects.filter(cart_id=cart_id, product_id__in={p.pk for p, _, _ in lines})
+        }
+        wanted = {}
+        for product, variant, quantity in lines:
+            key = (product.pk, variant.pk if variant else None)
+            if mode == "add":
+                base = wanted.get(key, existing[key].quantity if key in existing else 0)
+                wanted[key] = base + quantity
+            else:
+                wanted[key] = quantity
+
+        to_create, to_update, to_delete = [], [], []
+        for (product_id, variant_id), quantity in wanted.items():
+            item = existing.get((product_id, variant_id))
+            if quantity == 0:
+                if item is not None:
+                    to_delete.append(item.pk)
+            elif item is None:
+                to_create.append(CartItem(cart_id=cart_id, product_id=product_id, variant_id=variant_id, quantity=quantity))
+            elif item.quantity != quantity:
+                item.quantity = quantity
+                to_update.append(item)
+
+        if to_delete:
+            CartItem.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            CartItem.objects.bulk_update(to_update, ["quantity"])
+        if to_create:
+            CartItem.objects.bulk_create(to_create)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def batch_update_cart(request):
+    """
+    Expects payload: { "items": [ { "product_id": 1, "variant_id": null, "quantity": 2 }, ... ],
+                       "mode": "set" | "add" }
+    "set" (default) makes each line's quantity exactly `quantity`, "add" adds
+    to it (e.g. merging a guest cart after login). A resulting quantity of 0
+    removes the line. Returns the updated cart.
+    """
+    mode = request.data.get("mode", "set")
+    if mode not in ("set", "add"):
+        return Response({"error": "mode must be 'set' or 'add'"}, status=status.HTTP_400_BAD_REQUEST)
+    operations = CartOperationSerializer(data=request.data.get("items", []), many=True)
+    if not operations.is_valid():
+        return Response({"items": operations.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        lines = resolve_lines(operations.validated_data)
+    except UnknownProducts as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Resolve the lazy cart first: a cart created inside a rolled-back
+    # attempt would be lost while its id stayed cached.
+    cart = request.cart
+    cart_id = cart.id
+    for attempt in range(BATCH_RETRIES):
+        try:
+            _apply_batch(cart_id, lines, mode)
+            break
+        except IntegrityError:
+            # A concurrent request created one of the same lines between our
+            # read and insert; re-read and apply the batch on top of it.
+            if attempt == BATCH_RETRIES - 1:
+                raise
+
+    return cart_response(request, cart)
+
 # ---------------------------
 # UPDATE CART ITEM
 # ---------------------------
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
 def update_cart_item(request, item_id):
-    cart_item = get_object_or_404(CartItem, id=item_id, cart__user=request.user)
+    cart_item = get_object_or_404(CartItem, id=item_id, cart_id=request.cart.id)
     quantity = int(request.data.get("quantity", cart_item.quantity))
     if quantity < 1:
         return Response({"error": "Quantity must be at least 1"}, status=status.HTTP_400_BAD_REQUEST)
     cart_item.quantity = quantity
     cart_item.save()
-    serializer = CartItemSerializer(cart_item)
+    serializer = CartItemSerializer(cart_item, **sparse_options(request))
     return Response(serializer.data)
 
 # ---------------------------
@@ -62,7 +157,7 @@ def update_cart_item(request, item_id):
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def remove_cart_item(request, item_id):
-    cart_item = get_object_or_404(CartItem, id=item_id, cart__user=request.user)
+    cart_item = get_object_or_404(CartItem, id=item_id, cart_id=request.cart.id)
     cart_item.delete()
     return Response({"success": "Item removed from cart"}, status=status.HTTP_204_NO_CONTENT)
 
@@ -72,12 +167,9 @@ def remove_cart_item(request, item_id):
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def clear_cart(request):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart.items.all().delete()
+    CartItem.objects.filter(cart_id=request.cart.id).delete()
     return Response({"success": "Cart cleared"}, status=status.HTTP_204_NO_CONTENT)
 
-PAYSTACK_SECRET_KEY = settings.PAYSTACK_SECRET_KEY
-
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def checkout(request):
@@ -85,53 +177,30 @@ def checkout(request):
     Converts cart items to an Order and initializes Paystack payment.
     """
     user = request.user
-    cart = get_object_or_404(Cart, user=user)
-    items = cart.items.all()
+    cart_id = request.cart.id
+    items = list(CartItem.objects.filter(cart_id=cart_id).select_related("product", "variant"))
 
-    if not items.exists():
+    if not items:
         return Response({"error": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Create order
-    order = Order.objects.create(user=user)
-    total_price = 0
-
-    for item in items:
-        product = item.product
-        quantity = item.quantity
-        price = product.price * quantity
-
-        if product.stock < quantity:
-            return Response({"error": f"Not enough stock for {product.name}"}, status=status.HTTP_400_BAD_REQUEST)
-
-        OrderItem.objects.create(
-            order=order,
-            product=product,
-            quantity=quantity,
-            price=product.price
-        )
-        total_price += price
-
-        # Reduce stock
-        product.stock -= quantity
-        product.save()
-
-    order.total_price = total_price
-    order.save()
-
-    # Clear cart
-    items.delete()
+    # Create order, reserve stock and clear the cart all-or-nothing
+    try:
+        with transaction.atomic():
+            order = place_order(user, [(item.product, item.variant, item.quantity) for item in items])
+            CartItem.objects.filter(cart_id=cart_id).delete()
+    except InsufficientStock as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    total_price = order.total_price
 
     # Initialize Paystack
-    url = "https://api.paystack.co/transaction/initialize"
-    headers = {"Authorization": f"Bearer {PAYSTACK_SECRET_KEY}"}
-    data = {
-        "email": user.email,
-        "amount": int(total_price * 100),  # in kobo
-        "metadata": {"order_id": order.id}
-    }
-
-    response = requests.post(url, json=data, headers=headers)
-    res_data = response.json()
+    try:
+        res_data = get_paystack_client().initialize_transaction(user.email, total_price, {"order_id": order.id})
+    except PaymentGatewayError:
+        # The order stands; the client can retry via orders/<id>/pay/.
+        return Response(
+            {"error": "Payment gateway unavailable", "order_id": order.id},
+            status=status.HTTP_502_BAD_GATEWAY,
+        )
 
     if res_data.get("status"):
         Payment.objects.update_or_create(
@@ -0,0 +1,100 @@
+import hashlib
+import uuid
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from marketplace.routers import REPLICA_LAG_WINDOW, primary_reads
+
+CACHE_ALIAS = getattr(settings, "LISTINGS_CACHE_ALIAS", "default")
+CACHE_TIMEOUT = getattr(settings, "LISTINGS_CACHE_TIMEOUT", 300)  # seconds
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f"listings:version:{namespace}"
+
+
+def get_version(namespace):
+    """
+    Current ``(token, modified)`` for a namespace. Tokens are random, so a
+    version lost to eviction never repeats and old ETags cannot match.
+    """
+    return _cache().get_or_set(_version_key(namespace), lambda: (uuid.uuid4().hex, timezone.now()), None)
+
+
+def bump_version(*namespaces):
+    """
+    Invalidate every cached response in ``namespaces`` once the current
+    transaction commits (so readers never re-cache pre-commit data).
+    """
+    def bump():
+        now = timezone.now()
+        _cache().set_many(
+            {_version_key(namespace): (uuid.uuid4().hex, now) for namespace in namespaces},
+            None,
+        )
+    transaction.on_commit(bump)
+
+
+def product_namespace(product_id):
+    return f"product:{product_id}"
+
+
+def bump_products(product_ids):
+    bump_version(*(product_namespace(pk) for pk in set(product_ids)))
+
+
+def get_product_id(slug, lookup):
+    """Slug -> pk through the cache; slugs never change once assigned."""
+    key = f"listings:product-slug:{slug}"
+    pk = _cache().get(key)
+    if pk is None:
+        pk = lookup()
+        if pk is not None:
+            _cache().set(key, pk, CACHE_TIMEOUT)
+    return pk
+
+
+def forget_product_slug(slug):
+    _cache().delete(f"listings:product-slug:{slug}")
+
+
+def cached_response(request, namespace, render):
+    """
+    Serve ``render()``'s data from a versioned cache entry keyed by namespace,
+    path and query string, with ETag/Last-Modified validators. Conditional
+    requests that still match get a 304 without rendering or reading the
+    cached body. Views sharing a namespace get separate entries and ETags.
+    """
+    token, modified = get_version(namespace)
+    query = hashlib.md5(f"{request.path}?{request.GET.urlencode()}".encode()).hexdigest()[:12]
+    etag = f'"{token}-{query}"'
+    last_modified = int(modified.timestamp())
+
+    not_modified = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        response = Response(status=not_modified.status_code)
+    else:
+        key = f"listings:response:{namespace}:{token}:{query}"
+        data = _cache().get(key)
+        if data is None:
+            # Replicas may not have the change behind a fresh version yet.
+            fresh = (timezone.now() - modified).total_seconds() < REPLICA_LAG_WINDOW
+            with primary_reads() if fresh else nullcontext():
+                data = render()
+            _cache().set(key, data, CACHE_TIMEOUT)
+        response = Response(data)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
@@ -0,0 +1,262 @@
+"""
+Bulk catalogue import/export as CSV or JSON Lines.
+
+Imports are read as a stream and handled ``chunk_size`` rows at a time: each
+chunk is validated with ``ProductImportSerializer``, its categories are
+resolved with one query and its slugs allocated with one more, and products
+and variants are written with ``bulk_create`` in a single transaction.
+Invalid rows are reported and skipped. Exports iterate the table in chunks,
+so memory stays flat however large the catalogue is.
+
+CSV files have one product per line; variants go in one column as
+``name:price:stock`` entries separated by ``|``, e.g. ``Red:12.50:4|Blue:13.00:2``.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .cache import bump_version
+from .models import Category, Product, ProductVariant
+from .search import get_search_backend
+from .serializers import ProductImportSerializer
+from .slugs import allocate_slugs
+
+FORMATS = ("csv", "jsonl")
+CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+CSV_COLUMNS = ["slug", "name", "description", "price", "stock", "category", "variants"]
+MAX_ERRORS = 100  # reported individually; the rest are only counted
+
+
+def guess_format(filename):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return {"ndjson": "jsonl", "json": "jsonl"}.get(extension, extension)
+
+
+# ---------------------------
+# READING
+# ---------------------------
+def _parse_variants(value):
+    variants = []
+    for entry in filter(None, (part.strip() for part in value.split("|"))):
+        parts = entry.rsplit(":", 2)
+        if len(parts) != 3:
+            raise ValueError(f"Invalid variant {entry!r}, expected name:price:stock")
+        name, price, stock = parts
+        variants.append({"name": name, "price": price, "stock": stock})
+    return variants
+
+
+def _format_variants(variants):
+    return "|".join(f"{v['name']}:{v['price']}:{v['stock']}" for v in variants)
+
+
+def _csv_rows(text):
+    reader = csv.DictReader(text)
+    for row in reader:
+        try:
+            row["variants"] = _parse_variants(row.get("variants") or "")
+        except ValueError as exc:
+            yield reader.line_num, None, {"variants": [str(exc)]}
+        else:
+            yield reader.line_num, row, None
+
+
+def _jsonl_rows(text):
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as exc:
+            yield line, None, {"non_field_errors": [f"Invalid JSON: {exc}"]}
+            continue
+        if not isinstance(row, dict):
+            yield line, None, {"non_field_errors": ["Expected a JSON object."]}
+        else:
+            yield line, row, None
+
+
+def _guarded(rows):
+    # A file that is not UTF-8 or not valid CSV cannot be read past the
+    # failure; report it as an error on the next line and stop.
+    line = 0
+    try:
+        for line, row, error in rows:
+            yield line, row, error
+    except (csv.Error, ValueError) as exc:
+        yield line + 1, None, {"non_field_errors": [f"Could not read the file from here on: {exc}"]}
+
+
+def read_rows(stream, fmt):
+    """
+    Yield ``(line, row, error)`` for each record in the binary ``stream``;
+    ``row`` is None when the line could not be parsed. An undecodable or
+    malformed file ends with one error entry instead of raising.
+    """
+    readers = {"csv": _csv_rows, "jsonl": _jsonl_rows}
+    if fmt not in readers:
+        raise ValueError(f"Unsupported format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    return _guarded(readers[fmt](text))
+
+
+# ---------------------------
+# IMPORT
+# ---------------------------
+class ImportResult:
+    def __init__(self):
+        self.products = 0
+        self.variants = 0
+        self.categories = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, detail):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": line, "errors": detail})
+
+    def as_dict(self):
+        return {
+            "products": self.products,
+            "variants": self.variants,
+            "categories": self.categories,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def _resolve_categories(names, dry_run):
+    """Category name -> pk for ``names``, creating missing ones. Returns (ids, created)."""
+    if not names:
+        return {}, 0
+    ids = dict(Category.objects.filter(name__in=names).values_list("name", "pk"))
+    missing = names - ids.keys()
+    if missing and not dry_run:
+        # ignore_conflicts: a concurrent import may create the same names.
+        Category.objects.bulk_create([Category(name=name) for name in missing], ignore_conflicts=True)
+        ids.update(Category.objects.filter(name__in=missing).values_list("name", "pk"))
+    return ids, len(missing)
+
+
+def _import_chunk(chunk, seller_id, result, dry_run):
+    validator = ProductImportSerializer()
+    valid = []
+    for line, row, error in chunk:
+        if error is not None:
+            result.add_error(line, error)
+            continue
+        try:
+            valid.append(validator.run_validation(row))
+        except serializers.ValidationError as exc:
+            result.add_error(line, exc.detail)
+    if not valid:
+        return
+
+    category_names = {data["category"].strip() for data in valid if data.get("category", "").strip()}
+    with transaction.atomic():
+        category_ids, created = _resolve_categories(category_names, dry_run)
+        # Dry runs leave the slug counters alone; the slugs are never saved.
+        names = [data["name"] for data in valid]
+        slugs = names if dry_run else allocate_slugs(names)
+        products = [
+            Product(
+                seller_id=seller_id,
+                category_id=category_ids.get(data.get("category", "").strip()),
+                name=data["name"],
+                description=data.get("description", ""),
+                price=data["price"],
+                stock=data.get("stock", 0),
+                slug=slug,
+            )
+            for data, slug in zip(valid, slugs)
+        ]
+        variant_count = sum(len(data.get("variants", [])) for data in valid)
+        if not dry_run:
+            # bulk_create sends no post_save, so index search and bump caches here.
+            Product.objects.bulk_create(products, batch_size=500)
+            ProductVariant.objects.bulk_create(
+                [
+                    ProductVariant(product=product, **variant)
+                    for product, data in zip(products, valid)
+                    for variant in data.get("variants", [])
+                ],
+                batch_size=500,
+            )
+            get_search_backend().index_many(products)
+            if created:
+                bump_version("categories")
+    result.products += len(products)
+    result.variants += variant_count
+    result.categories += created
+
+
+def import_products(rows, seller_id, chunk_size=1000, dry_run=False):
+    """
+    Create products for ``seller_id`` from ``rows`` (as yielded by
+    ``read_rows``). Each chunk commits on its own; ``dry_run`` validates and
+    counts without writing. Returns an ``ImportResult``.
+    """
+    result = ImportResult()
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        _import_chunk(chunk, seller_id, result, dry_run)
+    return result
+
+
+# ---------------------------
+# EXPORT
+# ---------------------------
+def export_rows(queryset, chunk_size=2000):
+    """Yield one plain dict per product, reading ``chunk_size`` products at a time."""
+    queryset = queryset.select_related("category").prefetch_related("variants").order_by("id")
+    for product in queryset.iterator(chunk_size=chunk_size):
+        yield {
+            "slug": product.slug,
+            "name": product.name,
+            "description": product.description,
+            "price": str(product.price),
+            "stock": product.stock,
+            "category": product.category.name if product.category else "",
+            "variants": [
+                {"name": variant.name, "price": str(variant.price), "stock": variant.stock}
+                for variant in product.variants.all()
+            ],
+        }
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def _buffered(lines, size=500):
+    # One write per few hundred rows instead of per row.
+    while batch := "".join(islice(lines, size)):
+        yield batch
+
+
+def export_lines(queryset, fmt, chunk_size=2000):
+    """Yield the export of ``queryset`` as text in ``fmt``, a few hundred rows at a time."""
+    rows = export_rows(queryset, chunk_size)
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+
+        def lines():
+            yield writer.writerow(CSV_COLUMNS)
+            for row in rows:
+                row["variants"] = _format_variants(row["variants"])
+                yield writer.writerow([row[column] for column in CSV_COLUMNS])
+    elif fmt == "jsonl":
+        def lines():
+            for row in rows:
+                yield json.dumps(row, ensure_ascii=False) + "\n"
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    return _buffered(lines())
@@ -0,0 +1,160 @@
+"""
+Product image pipeline: uploads are stored as-is and processed in the
+background into EXIF-free originals plus WebP/AVIF renditions at
+PRODUCT_IMAGE_WIDTHS. ``process_images`` picks up anything the in-process
+pool did not finish (restarts, failures, images uploaded before the pipeline).
+"""
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, features
+
+from .cache import bump_products
+from .models import ProductImage
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = tuple(getattr(settings, "PRODUCT_IMAGE_WIDTHS", (160, 320, 640, 1280)))
+WORKERS = getattr(settings, "IMAGE_PROCESSING_WORKERS", 2)
+
+# Format -> Pillow save options. AVIF needs a Pillow built with libavif.
+RENDITION_FORMATS = {"webp": {"format": "WEBP", "quality": 80, "method": 4}}
+if features.check("avif"):
+    RENDITION_FORMATS["avif"] = {"format": "AVIF", "quality": 60, "speed": 8}
+
+# Formats whose originals can carry EXIF/XMP, and how to re-encode them.
+ORIGINAL_SAVE_OPTIONS = {
+    "JPEG": {"quality": 90, "optimize": True},
+    "PNG": {"optimize": True},
+    "WEBP": {"quality": 90},
+}
+
+
+def rendition_path(image, width, extension):
+    return f"product_images/renditions/{image.pk}/{width}.{extension}"
+
+
+def _replace(storage, name, content):
+    # Deterministic names, so reprocessing overwrites instead of piling up.
+    storage.delete(name)
+    return storage.save(name, ContentFile(content))
+
+
+def _encode(picture, **options):
+    buffer = io.BytesIO()
+    picture.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def process_image(image):
+    """
+    Strip metadata from ``image``'s original if it has any (applying its EXIF
+    orientation first), then write one rendition per format and width, up to
+    the original's own width. Saves dimensions, renditions and ``status="ready"``.
+    """
+    storage = image.image.storage
+    with image.image.open("rb") as file:
+        original = Image.open(file)
+        original_format = original.format
+        original.load()
+    picture = ImageOps.exif_transpose(original)
+    if picture.mode not in ("RGB", "RGBA"):
+        has_alpha = picture.mode in ("LA", "PA") or "transparency" in picture.info
+        picture = picture.convert("RGBA" if has_alpha else "RGB")
+
+    # Re-encode the original only when it carries metadata (GPS, camera
+    # serials); saving without the exif argument drops it.
+    has_metadata = original.getexif() or "xmp" in original.info
+    if has_metadata and original_format in ORIGINAL_SAVE_OPTIONS:
+        stripped = picture.convert("RGB") if original_format == "JPEG" else picture
+        content = _encode(
+            stripped,
+            format=original_format,
+            icc_profile=original.info.get("icc_profile"),
+            **ORIGINAL_SAVE_OPTIONS[original_format],
+        )
+        image.image.name = _replace(storage, image.image.name, content)
+
+    width, height = picture.size
+    widths = [w for w in WIDTHS if w < width]
+    if width <= max(WIDTHS):
+        widths.append(width)  # small originals still get a full-size rendition
+    renditions = {}
+    for extension, save_options in RENDITION_FORMATS.items():
+        renditions[extension] = {}
+        for target in widths:
+            thumbnail = picture.copy()
+            thumbnail.thumbnail((target, height), Image.Resampling.LANCZOS)
+            path = _replace(storage, rendition_path(image, target, extension), _encode(thumbnail, **save_options))
+            renditions[extension][str(target)] = path
+
+    image.width, image.height = width, height
+    image.renditions = renditions
+    image.status = "ready"
+    ProductImage.objects.filter(pk=image.pk).update(
+        image=image.image.name, width=width, height=height, renditions=renditions, status="ready"
+    )
+    bump_products([image.product_id])
+
+
+def claim(image_ids):
+    """Mark pending images as processing; returns the ones this caller won."""
+    claimed = []
+    for image in ProductImage.objects.filter(pk__in=image_ids, status="pending"):
+        if ProductImage.objects.filter(pk=image.pk, status="pending").update(status="processing"):
+            claimed.append(image)
+    return claimed
+
+
+def process_images(image_ids):
+    """Claim and process ``image_ids``. Returns ``(ready, failed)`` counts."""
+    ready = failed = 0
+    for image in claim(image_ids):
+        try:
+            process_image(image)
+        except Exception:
+            logger.exception("Processing product image %s failed", image.pk)
+            ProductImage.objects.filter(pk=image.pk).update(status="failed")
+            failed += 1
+        else:
+            ready += 1
+    return ready, failed
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="product-images")
+    return _executor
+
+
+def _run_in_worker(image_ids):
+    close_old_connections()
+    try:
+        process_images(image_ids)
+    except Exception:
+        logger.exception("Product image batch %s failed", image_ids)
+    finally:
+        close_old_connections()
+
+
+def schedule_processing(image_ids):
+    """Process ``image_ids`` on the worker pool once the current transaction commits."""
+    image_ids = list(image_ids)
+
+    def submit():
+        executor = _get_executor()
+        for pk in image_ids:
+            executor.submit(_run_in_worker, [pk])
+    transaction.on_commit(submit)
@@ -0,0 +1,98 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+from listings.models import Product, ProductImage, ProductReview, ProductVariant, Wishlist
+from listings.search import get_search_backend
+from orders.models import Notification, Order, OrderItem, Payment
+
+# Placeholder parameters; the plans don't depend on the values.
+ID = 1
+NOW = timezone.now()
+
+
+def query_catalogue():
+    """
+    ``(name, queryset)`` for the queries the views and workers run, written
+    the way they build them. Add an entry when adding a new hot query.
+    """
+    newest = ("-created_at", "-id")
+    keyset = (Q(created_at__lte=NOW), Q(created_at__lt=NOW) | Q(id__lt=ID))
+    return [
+        # listings
+        ("product list", Product.objects.order_by(*newest)[:10]),
+        ("product list, cursor page", Product.objects.filter(*keyset).order_by(*newest)[:10]),
+        ("product list by category", Product.objects.filter(category_id=ID).order_by(*newest)[:10]),
+        ("product list by rating", Product.objects.filter(rating_avg__gte=4).order_by("-rating_avg", "-id")[:10]),
+        ("product search", get_search_backend().search(Product.objects.all(), "lamp")[:10]),
+        ("product detail", Product.objects.filter(slug="lamp")),
+        ("product variants", ProductVariant.objects.filter(product_id=ID)),
+        ("pending images", ProductImage.objects.filter(status="pending").order_by("id")[:50]),
+        ("product reviews", ProductReview.objects.filter(product_id=ID).select_related("user")),
+        ("product reviews, cursor page", ProductReview.objects.filter(product_id=ID).filter(*keyset).order_by(*newest)[:10]),
+        ("wishlist", Wishlist.objects.filter(user_id=ID).order_by("-added_at", "-id")[:10]),
+        # cart
+        ("cart by user", Cart.objects.filter(user_id=ID)),
+        ("cart lines with totals", CartItem.objects.filter(cart_id=ID).with_totals()),
+        ("cart line by product", CartItem.objects.filter(cart_id=ID, product_id=ID, variant=None)),
+        # orders
+        ("order history", Order.objects.filter(user_id=ID).order_by(*newest)[:10]),
+        ("order history by status", Order.objects.filter(user_id=ID, status__in=["pending"]).order_by(*newest)[:10]),
+        (
+            "order history by date",
+            Order.objects.filter(user_id=ID, created_at__gte=NOW, created_at__lt=NOW).order_by(*newest)[:10],
+        ),
+        ("order items", OrderItem.objects.filter(order_id__in=[ID, ID + 1]).order_by("id")),
+        ("orders by status (admin)", Order.objects.filter(status="pending").order_by("-created_at")[:100]),
+        ("payment by reference", Payment.objects.filter(reference="ref", status="pending")),
+        ("payments by status (admin)", Payment.objects.filter(status="pending").order_by("created_at")[:100]),
+        (
+            "due notifications",
+            Notification.objects.filter(Q(status="pending") | Q(status="sending"), next_attempt_at__lte=NOW)
+            .order_by("next_attempt_at", "id")[:50],
+        ),
+        ("claimed notifications", Notification.objects.filter(claimed_by="token", status="sending")),
+    ]
+
+
+# One pattern per backend; the captured group is the scanned table.
+FULL_SCAN = {
+    "sqlite": re.compile(r"\bSCAN (?!\(|CONSTANT ROW)(\S+)(?!.*\b(?:USING|VIRTUAL TABLE)\b)"),
+    "postgresql": re.compile(r"\bSeq Scan on (\S+)"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the catalogue of the app's hot querysets and fail if "
+        "any of them scans a whole table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not just failures.")
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"No plan checks for the {connection.vendor} backend.")
+
+        failures = []
+        for name, queryset in query_catalogue():
+            plan = queryset.explain()
+            scans = [match.group(1) for match in map(pattern.search, plan.splitlines()) if match]
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {name}: {', '.join(scans)}"))
+            else:
+                self.stdout.write(f"ok         {name}")
+            if scans or options["verbose_plans"]:
+                for line in plan.splitlines():
+                    self.stdout.write(f"             {line}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} of the catalogued queries do full table scans.")
+        self.stdout.write(self.style.SUCCESS("No full table scans."))
@@ -0,0 +1,106 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from cart.models import Cart, CartItem
+from listings.models import Category, Product, ProductImage
+from marketplace.parsers import ORJSONParser
+from marketplace.renderers import ORJSONRenderer, orjson
+
+
+class Rollback(Exception):
+    pass
+
+
+class BytesStream:
+    """Minimal stream for parsers; a fresh one per parse."""
+
+    def __init__(self, content):
+        self.content = content
+
+    def read(self, *args):
+        content, self.content = self.content, b""
+        return content
+
+
+class Command(BaseCommand):
+    help = (
+        "Render and parse a 50-product listing and a 200-item cart with DRF's "
+        "stdlib JSON renderer/parser and the orjson-backed ones, and check "
+        "both produce the same JSON. Seed data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed; ORJSONRenderer falls back to the stdlib.")
+        try:
+            with transaction.atomic():
+                payloads = self.seed()
+                raise Rollback
+        except Rollback:
+            pass
+        for label, data in payloads:
+            self.compare(label, data, options["iterations"])
+
+    def seed(self):
+        seller = User.objects.create_user(email="json-bench-seller@example.com", password=None)
+        buyer = User.objects.create_user(email="json-bench-buyer@example.com", password=None)
+        category = Category.objects.create(name="JSON bench")
+        products = Product.objects.bulk_create([
+            Product(seller=seller, category=category, name=f"Bench {i} – “quoted” ünïcode", slug=f"json-bench-{i}",
+                    price="1234.50", stock=100, description="x" * 2000)
+            for i in range(200)
+        ])
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image=f"product_images/bench-{product.pk}-{n}.jpg")
+            for product in products[:50] for n in range(3)
+        ])
+        cart = Cart.objects.create(user=buyer)
+        CartItem.objects.bulk_create([CartItem(cart=cart, product=p, quantity=2) for p in products])
+
+        client = APIClient()
+        client.force_authenticate(buyer)
+        listing = client.get("/api/marketplace/products/?page_size=50").data
+        cart_data = client.get("/api/cart/").data
+        # Raw rows: Decimal and datetime values go through the encoders' type handling.
+        rows = list(Product.objects.filter(pk__in=[p.pk for p in products[:50]]).values())
+        return [
+            ("50 products (GET /api/marketplace/products/)", listing),
+            ("200 cart items (GET /api/cart/)", cart_data),
+            ("50 product rows (Decimal/datetime values)", rows),
+        ]
+
+    def compare(self, label, data, iterations):
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        results = {}
+        for name, renderer, parser in (
+            ("stdlib", JSONRenderer(), JSONParser()),
+            ("orjson", ORJSONRenderer(), ORJSONParser()),
+        ):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                content = renderer.render(data, "application/json")
+            render_ms = (time.perf_counter() - started) * 1000 / iterations
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                parsed = parser.parse(BytesStream(content), "application/json")
+            parse_ms = (time.perf_counter() - started) * 1000 / iterations
+
+            results[name] = (content, parsed)
+            self.stdout.write(
+                f"  {name}: render {render_ms:.3f} ms, parse {parse_ms:.3f} ms, {len(content)} bytes"
+            )
+
+        stdlib, fast = results["stdlib"], results["orjson"]
+        if stdlib[0] != fast[0] or stdlib[1] != fast[1]:
+            raise CommandError(f"{label}: orjson output differs from the stdlib renderer")
+        self.stdout.write(self.style.SUCCESS("  identical JSON"))
@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+
+from accounts.models import User
+from listings.models import Product
+from listings.views import ProductPagination
+from marketplace.pagination import KeysetPagination
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare page-number and keyset pagination latency on a deep page. "
+        "Seed data is created inside a transaction and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page", type=int, default=1000)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["page"], options["page_size"], options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, page, page_size, repeat):
+        total = page * page_size
+        seller = User.objects.create_user(email="pagination-bench@example.com", password=None)
+        Product.objects.bulk_create(
+            [
+                Product(seller=seller, name=f"Bench {i}", slug=f"pagination-bench-{i}", price=1)
+                for i in range(total)
+            ],
+            batch_size=1000,
+        )
+        queryset = Product.objects.order_by("-created_at", "-id")
+        factory = RequestFactory()
+
+        # Row that ends the previous page; its cursor points at `page`.
+        keyset = KeysetPagination()
+        keyset.page_size = page_size
+        anchor = queryset[(page - 1) * page_size - 1]
+        cursor = keyset.encode_cursor(anchor)
+
+        page_request = Request(factory.get("/", {"page": page, "page_size": page_size}))
+        keyset_request = Request(factory.get("/", {"cursor": cursor, "page_size": page_size}))
+
+        for label, paginator_class, request in (
+            ("page-number", ProductPagination, page_request),
+            ("keyset", KeysetPagination, keyset_request),
+        ):
+            timings = []
+            for _ in range(repeat):
+                paginator = paginator_class()
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    rows = list(paginator.paginate_queryset(queryset, request))
+                    timings.append(time.perf_counter() - started)
+            timings.sort()
+            self.stdout.write(
+                f"{label:>12}: page {page} of {total} rows, {len(rows)} rows, "
+                f"{len(queries)} queries, median {timings[len(timings) // 2] * 1000:.2f} ms"
+            )
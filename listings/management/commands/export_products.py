@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from listings.catalog import FORMATS, export_lines
+from listings.models import Product
+
+
+class Command(BaseCommand):
+    help = "Export products as CSV or JSON Lines in the format import_products reads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--seller", help="Only export this seller's products (email).")
+        parser.add_argument("--output", help="File to write; defaults to stdout.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        products = Product.objects.all()
+        if options["seller"]:
+            products = products.filter(seller__email=options["seller"])
+        lines = export_lines(products, options["format"], chunk_size=options["chunk_size"])
+
+        if options["output"]:
+            # newline="": the csv module already writes \r\n line endings.
+            with Path(options["output"]).open("w", encoding="utf-8", newline="") as output:
+                output.writelines(lines)
+        else:
+            sys.stdout.writelines(lines)
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from listings.catalog import FORMATS, guess_format, import_products, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import products from a CSV or JSON Lines file (see listings.catalog "
+        "for the columns), streaming it in chunks. Invalid rows are reported "
+        "and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--seller", required=True, help="Email of the seller who will own the products.")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Validate without saving anything.")
+
+    def handle(self, *args, **options):
+        try:
+            seller = get_user_model().objects.get(email=options["seller"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['seller']}.")
+
+        path = options["path"]
+        fmt = options["format"] or (None if path == "-" else guess_format(path))
+        if fmt not in FORMATS:
+            raise CommandError("Cannot tell the file format; pass --format.")
+
+        if path == "-":
+            result = self.run(sys.stdin.buffer, fmt, seller, options)
+        else:
+            with Path(path).open("rb") as stream:
+                result = self.run(stream, fmt, seller, options)
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... and {result.error_count - len(result.errors)} more errors")
+        verb = "Would import" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            f"{verb} {result.products} products, {result.variants} variants and "
+            f"{result.categories} new categories; {result.error_count} rows skipped."
+        )
+
+    def run(self, stream, fmt, seller, options):
+        return import_products(
+            read_rows(stream, fmt), seller.pk, chunk_size=options["chunk_size"], dry_run=options["dry_run"]
+        )
@@ -0,0 +1,125 @@
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from listings.models import Product
+from marketplace.database import sqlite_database
+from orders.models import Notification
+
+ALIAS = "loadtest"
+
+MODES = {
+    # Django's defaults: rollback journal, deferred transactions, no pragmas.
+    "untuned": lambda path: {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": path,
+        "PRAGMAS": {"journal_mode": "DELETE"},
+    },
+    "tuned": lambda path: sqlite_database(path, conn_max_age=None),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent readers and writers against a copy of the default "
+        "SQLite database (db.sqlite3) and report throughput, latency and "
+        "'database is locked' errors, untuned vs tuned. The real file is "
+        "never written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run.")
+        parser.add_argument("--mode", choices=[*MODES, "both"], default="both")
+
+    def handle(self, *args, **options):
+        source = settings.DATABASES["default"]
+        if source["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("The default database is not SQLite.")
+
+        modes = list(MODES) if options["mode"] == "both" else [options["mode"]]
+        with tempfile.TemporaryDirectory() as tmp:
+            for mode in modes:
+                path = Path(tmp) / f"{mode}.sqlite3"
+                self.copy_database(source["NAME"], path)
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{mode}:"))
+                self.run(mode, path, options)
+
+    def copy_database(self, source, target):
+        # The backup API gives a consistent copy even with a live WAL.
+        with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+            src.backup(dst)
+        for suffix in ("-wal", "-shm"):
+            Path(f"{target}{suffix}").unlink(missing_ok=True)
+
+    def run(self, mode, path, options):
+        # configure_settings fills in Django's per-alias defaults (and insists on a default alias).
+        configured = connections.configure_settings({"default": {}, ALIAS: MODES[mode](str(path))})
+        connections.settings[ALIAS] = configured[ALIAS]
+        deadline = time.monotonic() + options["seconds"]
+        results = {"read": [], "write": []}
+        errors = {"read": 0, "write": 0}
+        lock = threading.Lock()
+
+        def worker(kind, operation):
+            latencies, failed = [], 0
+            try:
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        operation()
+                    except OperationalError:
+                        failed += 1
+                    else:
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connections[ALIAS].close()
+            with lock:
+                results[kind].extend(latencies)
+                errors[kind] += failed
+
+        threads = [threading.Thread(target=worker, args=("read", self.read)) for _ in range(options["readers"])]
+        threads += [threading.Thread(target=worker, args=("write", self.write)) for _ in range(options["writers"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+        connections[ALIAS].close()
+        del connections[ALIAS]
+        del connections.settings[ALIAS]
+
+        self.stdout.write(f"  journal_mode={journal_mode}")
+        for kind in ("read", "write"):
+            latencies = sorted(results[kind])
+            rate = len(latencies) / options["seconds"]
+            if len(latencies) >= 2:
+                p50, p95 = (statistics.quantiles(latencies, n=100)[i] * 1000 for i in (49, 94))
+                spread = f"p50 {p50:.2f} ms, p95 {p95:.2f} ms, max {latencies[-1] * 1000:.1f} ms"
+            else:
+                spread = "too few samples"
+            self.stdout.write(f"  {kind:<5}: {rate:8.0f}/s  {spread}  locked errors: {errors[kind]}")
+
+    def read(self):
+        list(Product.objects.using(ALIAS).order_by("-created_at", "-id")[:20])
+        Notification.objects.using(ALIAS).filter(status="pending").count()
+
+    def write(self):
+        # Read then write in one transaction: the pattern that fails with
+        # "database is locked" when a deferred read lock can't be upgraded.
+        with transaction.atomic(using=ALIAS):
+            pending = Notification.objects.using(ALIAS).filter(status="pending").count()
+            Notification.objects.using(ALIAS).create(
+                recipient="loadtest@example.com", subject="Load test", message=str(pending)
+            )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from listings.images import process_images
+from listings.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = (
+        "Process product images still pending (uploads the in-process pool "
+        "did not finish, or images from before the pipeline existed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--retry-failed", action="store_true", help="Also retry images that failed.")
+        parser.add_argument(
+            "--reset-processing",
+            action="store_true",
+            help="Requeue images left 'processing' by a worker that died. Don't use while workers run.",
+        )
+
+    def handle(self, *args, **options):
+        requeue = ["failed"] if options["retry_failed"] else []
+        if options["reset_processing"]:
+            requeue.append("processing")
+        if requeue:
+            ProductImage.objects.filter(status__in=requeue).update(status="pending")
+
+        total_ready = total_failed = 0
+        while True:
+            ids = list(
+                ProductImage.objects.filter(status="pending").order_by("id")
+                .values_list("pk", flat=True)[:options["batch_size"]]
+            )
+            if not ids:
+                break
+            ready, failed = process_images(ids)
+            total_ready += ready
+            total_failed += failed
+        self.stdout.write(f"Processed {total_ready} images, {total_failed} failed.")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from listings.ratings import recompute_rating_aggregates
+
+
+class Command(BaseCommand):
+    help = "Recompute Product rating_count/rating_sum/rating_avg from reviews."
+
+    def handle(self, *args, **options):
+        drifted = recompute_rating_aggregates()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed ratings; {drifted} products had drifted"))
@@ -0,0 +1,77 @@
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, OperationalError, connection
+
+from accounts.models import User
+from listings.models import Product, SlugCounter
+from listings.slugs import allocate_slugs, base_slug
+
+NAME = "Stress Slug Product"
+
+
+class Command(BaseCommand):
+    help = (
+        "Create identically named products from many threads at once, one by "
+        "one and in bulk, and verify every slug is unique. Seed rows are "
+        "committed and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--per-thread", type=int, default=25, help="Products each thread creates.")
+
+    def handle(self, *args, **options):
+        seller = User.objects.create_user(email="stress-slugs@example.com", password=None)
+        try:
+            created, errors = self.run(seller, options["threads"], options["per_thread"])
+            self.verify(seller, created, errors)
+        finally:
+            seller.delete()
+            SlugCounter.objects.filter(base=base_slug(NAME)).delete()
+
+    def run(self, seller, threads, per_thread):
+        created = []
+        errors = []
+        lock = threading.Lock()
+        start = threading.Barrier(threads)
+
+        def worker(index):
+            start.wait()
+            try:
+                if index % 2:
+                    # Product.save() path: one allocation per product.
+                    slugs = [
+                        Product.objects.create(seller=seller, name=NAME, price=1).slug
+                        for _ in range(per_thread)
+                    ]
+                else:
+                    # Import path: one allocation for the whole batch.
+                    slugs = allocate_slugs([NAME] * per_thread)
+                    Product.objects.bulk_create(
+                        [Product(seller=seller, name=NAME, price=1, slug=slug) for slug in slugs]
+                    )
+            except (IntegrityError, OperationalError) as exc:
+                with lock:
+                    errors.append(exc)
+            else:
+                with lock:
+                    created.extend(slugs)
+            finally:
+                connection.close()
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        self.stdout.write(f"{threads} threads: {len(created)} products created, {len(errors)} errors")
+        return created, errors
+
+    def verify(self, seller, created, errors):
+        stored = list(Product.objects.filter(seller=seller).values_list("slug", flat=True))
+        if errors:
+            raise CommandError(f"{len(errors)} threads failed, first: {errors[0]}")
+        if len(set(stored)) != len(stored) or sorted(stored) != sorted(created):
+            raise CommandError(f"Slug collision: {len(stored)} products, {len(set(stored))} distinct slugs")
+        self.stdout.write(self.style.SUCCESS(f"All {len(stored)} slugs unique"))
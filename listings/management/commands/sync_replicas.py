@@ -0,0 +1,41 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from marketplace.routers import replica_aliases
+
+
+def sqlite_path(entry):
+    # Replicas are opened as "file:<path>?mode=ro" URIs.
+    return str(entry["NAME"]).removeprefix("file:").split("?", 1)[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into every SQLite replica alias, "
+        "once or every --interval seconds. Stands in for real replication "
+        "when running replicas locally."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, help="Keep syncing every N seconds.")
+
+    def handle(self, *args, **options):
+        primary = connections.settings[DEFAULT_DB_ALIAS]
+        replicas = [alias for alias in replica_aliases() if connections.settings[alias]["ENGINE"] == primary["ENGINE"]]
+        if primary["ENGINE"] != "django.db.backends.sqlite3" or not replicas:
+            raise CommandError("No SQLite replicas configured (mark DATABASES entries with \"REPLICA\": True).")
+
+        while True:
+            started = time.perf_counter()
+            with sqlite3.connect(sqlite_path(primary)) as source:
+                for alias in replicas:
+                    with sqlite3.connect(sqlite_path(connections.settings[alias]), timeout=30) as target:
+                        # One step, so readers see the old copy or the new one.
+                        source.backup(target)
+            self.stdout.write(f"Synced {', '.join(replicas)} in {(time.perf_counter() - started) * 1000:.0f} ms")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:38
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Avg, Count, Sum
+
+
+def backfill_ratings(apps, schema_editor):
+    Product = apps.get_model("listings", "Product")
+    ProductReview = apps.get_model("listings", "ProductReview")
+    totals = (
+        ProductReview.objects.order_by()
+        .values("product_id")
+        .annotate(count=Count("id"), total=Sum("rating"), avg=Avg("rating"))
+    )
+    products = []
+    for row in totals.iterator():
+        products.append(Product(
+            pk=row["product_id"],
+            rating_count=row["count"],
+            rating_sum=row["total"],
+            rating_avg=row["avg"],
+        ))
+    Product.objects.bulk_update(products, ["rating_count", "rating_sum", "rating_avg"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0005_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['rating_avg', 'id'], name='product_rating_avg_id_idx'),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:05
+
+import re
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    # Reserve every existing slug the way listings.slugs.reserve_slug would.
+    Product = apps.get_model("listings", "Product")
+    SlugCounter = apps.get_model("listings", "SlugCounter")
+    last = {}
+    for slug in Product.objects.values_list("slug", flat=True).iterator():
+        match = re.fullmatch(r"(.+)--(\d+)", slug)
+        base, number = (match[1], int(match[2])) if match else (slug, 1)
+        last[base] = max(last.get(base, 0), number)
+    SlugCounter.objects.bulk_create(
+        [SlugCounter(base=base, last=number) for base, number in last.items()], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0008_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlugCounter',
+            fields=[
+                ('base', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('last', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
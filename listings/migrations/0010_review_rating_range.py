@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:33
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0009_slug_counter'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productreview',
+            name='rating',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+    ]
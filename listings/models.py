@@ -1,7 +1,7 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 from accounts.models import User
-from django.utils.text import slugify
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -19,19 +19,59 @@ class Product(models.Model):
     slug = models.SlugField(unique=True, blank=True)
     stock = models.PositiveIntegerField(default=0) 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Review aggregates, maintained by listings.signals (see listings.ratings)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="product_created_id_idx"),
+            models.Index(fields=["category", "created_at", "id"], name="product_cat_created_id_idx"),
+            models.Index(fields=["rating_avg", "id"], name="product_rating_avg_id_idx"),
+        ]
 
     def save(self, *args, **kwargs):
+        from .slugs import allocate_slug, reserve_slug
         if not self.slug:
-            self.slug = slugify(self.name)
+            self.slug = allocate_slug(self.name)
+        elif self._state.adding:
+            reserve_slug(self.slug)  # so allocation never hands it out again
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
 
+class SlugCounter(models.Model):
+    """Highest number handed out per product slug base (see listings.slugs)."""
+    base = models.CharField(max_length=255, primary_key=True)
+    last = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.base} ({self.last})"
+
+
 class ProductImage(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="images")
     image = models.ImageField(upload_to="product_images/")
+    # Filled in by listings.images once the upload has been processed.
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    renditions = models.JSONField(default=dict, blank=True)  # {"webp": {"320": "path", ...}, ...}
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status"], name="productimage_status_idx"),
+        ]
 
 
 from django.conf import settings
@@ -39,12 +79,22 @@ from django.conf import settings
 class ProductReview(models.Model):
     product = models.ForeignKey(Product, related_name="reviews", on_delete=models.CASCADE)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    rating = models.IntegerField()  # 1 to 5
+    rating = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
     comment = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored rating so edits can adjust the product aggregates
+        instance._loaded_rating = instance.__dict__.get("rating")
+        return instance
+
     class Meta:
         unique_together = ("product", "user")  # one review per user per product
+        indexes = [
+            models.Index(fields=["product", "created_at", "id"], name="review_product_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.product.name} ({self.rating})"
@@ -66,3 +116,6 @@ class Wishlist(models.Model):
 
     class Meta:
         unique_together = ("user", "product")
+        indexes = [
+            models.Index(fields=["user", "added_at", "id"], name="wishlist_user_added_id_idx"),
+        ]
@@ -0,0 +1,62 @@
+from django.db.models import Avg, Case, Count, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Greatest
+
+from .cache import bump_products
+from .models import Product, ProductReview
+
+
+def update_rating_aggregates(product_id, count_delta, sum_delta):
+    """
+    Apply a review change to the product's rating columns in one UPDATE.
+    The columns are clamped at zero so aggregates that drifted (e.g. after a
+    bulk_create of reviews) can't fail the CHECK constraints and block a
+    delete; ``recompute_ratings`` repairs them.
+    """
+    if not count_delta and not sum_delta:
+        return
+    new_count = Greatest(F("rating_count") + count_delta, 0)
+    new_sum = Greatest(F("rating_sum") + sum_delta, 0)
+    Product.objects.filter(pk=product_id).update(
+        rating_count=new_count,
+        rating_sum=new_sum,
+        rating_avg=Case(
+            When(rating_count__lte=-count_delta, then=Value(0.0)),
+            default=Cast(new_sum, FloatField()) / new_count,
+            output_field=FloatField(),
+        ),
+    )
+    bump_products([product_id])
+
+
+def _review_aggregate(aggregate):
+    reviews = (
+        ProductReview.objects.filter(product=OuterRef("pk"))
+        .order_by()
+        .values("product")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+    return Subquery(reviews)
+
+
+def recompute_rating_aggregates(queryset=None):
+    """
+    Recompute the rating columns from ProductReview. Returns the number of
+    products whose stored aggregates had drifted.
+    """
+    if queryset is None:
+        queryset = Product.objects.all()
+    actual_count = Coalesce(_review_aggregate(Count("id")), 0)
+    actual_sum = Coalesce(_review_aggregate(Sum("rating")), 0)
+    drifted = (
+        queryset.annotate(actual_count=actual_count, actual_sum=actual_sum)
+        .filter(~Q(rating_count=F("actual_count")) | ~Q(rating_sum=F("actual_sum")))
+        .count()
+    )
+    queryset.update(
+        rating_count=actual_count,
+        rating_sum=actual_sum,
+        rating_avg=Coalesce(_review_aggregate(Avg("rating")), 0.0, output_field=FloatField()),
+    )
+    bump_products(queryset.values_list("pk", flat=True))
+    return drifted
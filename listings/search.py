@@ -0,0 +1,120 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+FTS_TABLE = "listings_product_fts"
+
+_token_re = re.compile(r"\w+", re.UNICODE)
+
+
+class BaseSearchBackend:
+    """
+    Interface for product search. ``search`` must return a Product queryset
+    so callers can keep filtering, eager loading and paginating it.
+    """
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def index(self, product):
+        pass
+
+    def remove(self, product_id):
+        pass
+
+    def index_many(self, products):
+        """Index newly created products (bulk_create sends no signals)."""
+        for product in products:
+            self.index(product)
+
+    def rebuild(self):
+        pass
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """
+    Portable fallback: unindexed ``icontains`` scan on name and description.
+    """
+
+    def search(self, queryset, query):
+        return queryset.filter(Q(name__icontains=query) | Q(description__icontains=query))
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 index mirrored from Product (see listings.signals).
+
+    Every word in the query is prefix-matched and results are ranked with
+    bm25, with name matches weighted above description matches.
+    """
+
+    name_weight = 10.0
+    description_weight = 1.0
+
+    def build_match(self, query):
+        tokens = _token_re.findall(query)
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def search(self, queryset, query):
+        match = self.build_match(query)
+        if not match:
+            return queryset.none()
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = listings_product.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+            select={"search_rank": f"bm25({FTS_TABLE}, %s, %s)"},
+            select_params=(self.name_weight, self.description_weight),
+            order_by=["search_rank", "-id"],
+        )
+
+    def index(self, product):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)",
+                [product.pk, product.name, product.description],
+            )
+
+    def remove(self, product_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product_id])
+
+    def index_many(self, products):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)",
+                [(product.pk, product.name, product.description) for product in products],
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, description) "
+                "SELECT id, name, description FROM listings_product"
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+
+_backend = None
+
+
+def get_search_backend():
+    """
+    Return the backend named by ``settings.PRODUCT_SEARCH_BACKEND``, defaulting
+    to FTS5 on SQLite and the icontains scan elsewhere.
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "PRODUCT_SEARCH_BACKEND", None)
+        if path is None:
+            if connection.vendor == "sqlite":
+                path = "listings.search.SQLiteFTSSearchBackend"
+            else:
+                path = "listings.search.BasicSearchBackend"
+        _backend = import_string(path)()
+    return _backend
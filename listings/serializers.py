@@ -1,44 +1,85 @@
 from rest_framework import serializers
+from marketplace.serializers import EagerLoadingMixin, SparseFieldsMixin
 from .models import Category, Product, ProductImage
 
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ["id", "name", "slug"]
+        fields = ["id", "name"]
 
 
-class ProductImageSerializer(serializers.ModelSerializer):
+class ProductImageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    ``srcset`` maps each rendition format to an HTML srcset string and
+    ``thumbnail`` is the smallest WebP; both are null until processed.
+    """
+    srcset = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    projection_fields = {"srcset": ["image", "renditions"], "thumbnail": ["image", "renditions"]}
+
     class Meta:
         model = ProductImage
-        fields = ["id", "image"]
+        fields = ["id", "image", "status", "width", "height", "srcset", "thumbnail"]
+        read_only_fields = ["status", "width", "height"]
+
+    def _url(self, image, path):
+        url = image.image.storage.url(path)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def get_srcset(self, image):
+        if not image.renditions:
+            return None
+        return {
+            extension: ", ".join(
+                f"{self._url(image, path)} {width}w"
+                for width, path in sorted(sizes.items(), key=lambda size: int(size[0]))
+            )
+            for extension, sizes in image.renditions.items()
+        }
+
+    def get_thumbnail(self, image):
+        sizes = image.renditions.get("webp")
+        if not sizes:
+            return None
+        return self._url(image, sizes[min(sizes, key=int)])
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductImageUploadSerializer(serializers.Serializer):
+    images = serializers.ListField(child=serializers.ImageField(), allow_empty=False)
+
+
+class ProductSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     # ✅ Nested serializer for images
     images = ProductImageSerializer(many=True, read_only=True)
     seller = serializers.StringRelatedField(read_only=True)  # Show seller username
 
+    select_related_fields = ("seller", "category")
+    prefetch_related_fields = ("images",)
+    expandable_fields = {"category": (CategorySerializer, {})}
+
     class Meta:
         model = Product
         fields = [
             "id",
-            "title",
+            "name",
             "slug",
             "description",
             "price",
             "category",
             "seller",
             "created_at",
-            "updated_at",
             "images",
             "stock",
+            "rating_count",
+            "rating_avg",
         ]
-        read_only_fields = ["slug", "seller", "created_at", "updated_at"]
+        read_only_fields = ["slug", "seller", "created_at", "rating_count", "rating_avg"]
 
 from .models import ProductReview
 
-class ProductReviewSerializer(serializers.ModelSerializer):
+class ProductReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
 
     class Meta:
@@ -48,13 +89,37 @@ class ProductReviewSerializer(serializers.ModelSerializer):
 
 from .models import ProductVariant
 
-class ProductVariantSerializer(serializers.ModelSerializer):
+class ProductVariantSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ProductVariant
         fields = ["id", "product", "name", "price", "stock"]
 
 from .models import Wishlist
-class WishlistSerializer(serializers.ModelSerializer):
+class WishlistSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {"product": (ProductSerializer, {})}
+
     class Meta:
         model = Wishlist
         fields = ["id", "user", "product", "added_at"]
+
+
+class ProductVariantImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductVariant
+        fields = ["name", "price", "stock"]
+
+
+class ProductImportSerializer(ProductSerializer):
+    """
+    One catalogue import row: ProductSerializer's field validation, with the
+    category given by name and variants inline. Validating a row makes no
+    queries; listings.catalog resolves categories and slugs per chunk.
+    """
+    images = None
+    seller = None
+    category = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    variants = ProductVariantImportSerializer(many=True, required=False)
+
+    class Meta(ProductSerializer.Meta):
+        fields = ["name", "description", "price", "stock", "category", "variants"]
+        read_only_fields = []
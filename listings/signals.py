@@ -0,0 +1,103 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+
+from .cache import bump_products, bump_version, forget_product_slug
+from .models import Category, Product, ProductImage, ProductReview, ProductVariant
+from .ratings import update_rating_aggregates
+from .search import get_search_backend
+
+
+# ---------------------------
+# SEARCH INDEX
+# ---------------------------
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+# ---------------------------
+# RATING AGGREGATES
+# ---------------------------
+@receiver(post_save, sender=ProductReview)
+def add_review_rating(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        update_rating_aggregates(instance.product_id, 1, instance.rating)
+    else:
+        previous = getattr(instance, "_loaded_rating", None)
+        if previous is not None:
+            update_rating_aggregates(instance.product_id, 0, instance.rating - previous)
+    instance._loaded_rating = instance.rating
+
+
+@receiver(post_delete, sender=ProductReview)
+def remove_review_rating(sender, instance, **kwargs):
+    rating = getattr(instance, "_loaded_rating", None)
+    if rating is None:
+        rating = instance.rating
+    update_rating_aggregates(instance.product_id, -1, -rating)
+
+
+# ---------------------------
+# RESPONSE CACHE
+# ---------------------------
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_categories(sender, **kwargs):
+    bump_version("categories")
+
+
+@receiver(post_save, sender=Category)
+def invalidate_category_products(sender, instance, created, raw=False, **kwargs):
+    # Product responses embed the category (?expand=category).
+    if raw or created:
+        return
+    bump_products(Product.objects.filter(category_id=instance.pk).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_products(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Product responses show sellers and reviewers by email; logins only
+    # touch last_login and leave them alone.
+    if raw or created or (update_fields is not None and "email" not in update_fields):
+        return
+    products = Product.objects.filter(Q(seller_id=instance.pk) | Q(reviews__user_id=instance.pk))
+    bump_products(products.values_list("pk", flat=True))
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    bump_products([instance.pk])
+    if kwargs.get("created") is None:  # post_delete: the slug may be reused
+        forget_product_slug(instance.slug)
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=ProductVariant)
+def invalidate_product_children(sender, instance, **kwargs):
+    bump_products([instance.product_id])
+
+
+# ---------------------------
+# IMAGE FILES
+# ---------------------------
+@receiver(post_delete, sender=ProductImage)
+def delete_image_renditions(sender, instance, **kwargs):
+    storage = instance.image.storage
+    paths = [path for sizes in instance.renditions.values() for path in sizes.values()]
+
+    def delete_files():
+        for path in paths:
+            storage.delete(path)
+    transaction.on_commit(delete_files)
@@ -0,0 +1,94 @@
+"""
+Product slug allocation.
+
+Every slug base (``slugify(name)``) has a ``SlugCounter`` row holding the
+highest number handed out for it. Allocating bumps the counter with a single
+``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``, which the database runs
+atomically, so concurrent allocations for the same name always get different
+numbers and no existence checks or retries are needed. The first product
+with a base gets the bare base, later ones ``<base>--<n>``. slugify() never
+produces "--", so numbered slugs cannot collide with another name's base.
+
+Needs SQLite 3.35+ or PostgreSQL.
+"""
+import re
+from collections import Counter
+
+from django.db import connections, router
+from django.utils.text import slugify
+
+from .models import Product, SlugCounter
+
+SLUG_LENGTH = Product._meta.get_field("slug").max_length
+SEPARATOR = "--"
+# Room for the separator and up to six digits.
+BASE_LENGTH = SLUG_LENGTH - len(SEPARATOR) - 6
+BATCH_SIZE = 500  # bases per statement
+
+NUMBERED = re.compile(rf"(.+){SEPARATOR}(\d+)")
+
+
+def base_slug(name):
+    return slugify(name)[:BASE_LENGTH].strip("-") or "product"
+
+
+def split_slug(slug):
+    """``"red-lamp--3"`` -> ``("red-lamp", 3)``; unnumbered slugs are number 1."""
+    match = NUMBERED.fullmatch(slug)
+    if match:
+        return match[1], int(match[2])
+    return slug, 1
+
+
+def numbered_slug(base, number):
+    return base if number == 1 else f"{base}{SEPARATOR}{number}"
+
+
+def _upsert(pairs, update):
+    """
+    Insert ``(base, value)`` counter rows, applying ``update`` to existing
+    ones, and return ``{base: last}`` after the statement.
+    """
+    connection = connections[router.db_for_write(SlugCounter)]
+    qn = connection.ops.quote_name
+    table, last = qn(SlugCounter._meta.db_table), qn("last")
+    update = update.format(current=f"{table}.{last}", new=f"excluded.{last}")
+    result = {}
+    with connection.cursor() as cursor:
+        for start in range(0, len(pairs), BATCH_SIZE):
+            batch = pairs[start:start + BATCH_SIZE]
+            cursor.execute(
+                f"INSERT INTO {table} ({qn('base')}, {last}) VALUES {', '.join(['(%s, %s)'] * len(batch))} "
+                f"ON CONFLICT ({qn('base')}) DO UPDATE SET {last} = {update} "
+                f"RETURNING {qn('base')}, {last}",
+                [value for pair in batch for value in pair],
+            )
+            result.update(cursor.fetchall())
+    return result
+
+
+def allocate_slugs(names):
+    """
+    Reserve one unique slug per name, in order. One query per BATCH_SIZE
+    distinct bases, however many names share a base.
+    """
+    bases = [base_slug(name) for name in names]
+    wanted = Counter(bases)
+    last = _upsert(list(wanted.items()), "{current} + {new}")
+    # Each base got the block (last - wanted, last]; hand it out in order.
+    number = {base: last[base] - count for base, count in wanted.items()}
+    slugs = []
+    for base in bases:
+        number[base] += 1
+        slugs.append(numbered_slug(base, number[base]))
+    return slugs
+
+
+def allocate_slug(name):
+    return allocate_slugs([name])[0]
+
+
+def reserve_slug(slug):
+    """Mark an explicitly chosen slug as taken so allocation skips past it."""
+    base, number = split_slug(slug)
+    _upsert([(base, number)], "CASE WHEN {current} < {new} THEN {new} ELSE {current} END")
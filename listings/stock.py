@@ -0,0 +1,70 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+
+from .cache import bump_products
+from .models import Product, ProductVariant
+
+
+class InsufficientStock(Exception):
+    def __init__(self, names):
+        self.names = names
+        super().__init__(f"Not enough stock for {', '.join(names)}")
+
+
+def _decrement(model, wanted):
+    """
+    Take ``wanted[pk]`` units from each row with one conditional UPDATE.
+    Returns the pks that could not be satisfied (empty on success). Must be
+    called inside a transaction.
+    """
+    if not wanted:
+        return []
+    quantity = Case(
+        *[When(pk=pk, then=Value(qty)) for pk, qty in wanted.items()],
+        output_field=PositiveIntegerField(),
+    )
+    savepoint = transaction.savepoint()
+    updated = model.objects.filter(pk__in=wanted, stock__gte=quantity).update(stock=F("stock") - quantity)
+    if updated == len(wanted):
+        transaction.savepoint_commit(savepoint)
+        return []
+    # Error path only: undo the partial UPDATE so the rows it decremented
+    # don't look short too, then find out which rows were.
+    transaction.savepoint_rollback(savepoint)
+    stock = dict(model.objects.filter(pk__in=wanted).values_list("pk", "stock"))
+    return [pk for pk, qty in wanted.items() if stock.get(pk, 0) < qty]
+
+
+def reserve_stock(lines):
+    """
+    Atomically take stock for ``lines`` (iterable of ``(product, variant,
+    quantity)``; ``variant`` may be None). Variant lines draw on
+    ``ProductVariant.stock``, the rest on ``Product.stock``.
+
+    At most one UPDATE per table is issued and each only succeeds row by row
+    when ``stock >= quantity``, so concurrent checkouts cannot oversell. If any
+    line is short, every decrement is rolled back and InsufficientStock is
+    raised. Call inside ``transaction.atomic`` to tie the reservation to the
+    order rows written alongside it.
+    """
+    products = Counter()
+    variants = Counter()
+    names = {}
+    product_ids = set()
+    for product, variant, quantity in lines:
+        product_ids.add(product.pk)
+        if variant is not None:
+            variants[variant.pk] += quantity
+            names[("variant", variant.pk)] = f"{product.name} ({variant.name})"
+        else:
+            products[product.pk] += quantity
+            names[("product", product.pk)] = product.name
+
+    with transaction.atomic():
+        short = [("product", pk) for pk in _decrement(Product, products)]
+        short += [("variant", pk) for pk in _decrement(ProductVariant, variants)]
+        if short:
+            raise InsufficientStock([names[key] for key in short])
+    bump_products(product_ids)
@@ -1,3 +1,148 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from .models import Category, Product, ProductImage, ProductReview
+from .slugs import allocate_slugs
+
+
+class ProductListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seller = User.objects.create_user(email="seller@example.com", password=None, is_seller=True)
+        category = Category.objects.create(name="Lamps")
+        products = Product.objects.bulk_create([
+            Product(seller=seller, category=category, name=f"Lamp {i}", slug=f"lamp-{i}", price=10, stock=5)
+            for i in range(60)
+        ])
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image=f"product_images/lamp-{product.pk}-{n}.jpg")
+            for product in products for n in range(2)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_queries_do_not_grow_with_page_size(self):
+        # COUNT, the page joined to seller and category, and the images.
+        for page_size in (5, 50):
+            with self.subTest(page_size=page_size), self.assertNumQueries(3):
+                response = self.client.get(reverse("product-list-create"), {"page_size": page_size})
+            self.assertEqual(len(response.data["results"]), page_size)
+            self.assertEqual(len(response.data["results"][0]["images"]), 2)
+
+    def test_cursor_pages_do_not_grow_with_page_size(self):
+        for page_size in (5, 50):
+            with self.subTest(page_size=page_size), self.assertNumQueries(2):
+                response = self.client.get(
+                    reverse("product-list-create"), {"pagination": "cursor", "page_size": page_size}
+                )
+            self.assertEqual(len(response.data["results"]), page_size)
+
+
+class SlugAllocationTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(email="seller@example.com", password=None)
+
+    def test_repeated_names_get_numbered_slugs(self):
+        slugs = [Product.objects.create(seller=self.seller, name="Red Lamp", price=1).slug for _ in range(3)]
+        self.assertEqual(slugs, ["red-lamp", "red-lamp--2", "red-lamp--3"])
+        self.assertEqual(allocate_slugs(["Red Lamp", "Blue Lamp", "Red Lamp"]), ["red-lamp--4", "blue-lamp", "red-lamp--5"])
+
+    def test_explicit_slugs_are_skipped(self):
+        Product.objects.create(seller=self.seller, name="Lamp", slug="lamp--7", price=1)
+        self.assertEqual(Product.objects.create(seller=self.seller, name="Lamp", price=1).slug, "lamp--8")
+
+
+class ConcurrentSlugTests(TransactionTestCase):
+    threads = 8
+    per_thread = 10
+
+    def test_concurrent_products_get_unique_slugs(self):
+        seller = User.objects.create_user(email="seller@example.com", password=None)
+        start = threading.Barrier(self.threads)
+        errors = []
+
+        def worker(index):
+            start.wait()
+            try:
+                if index % 2:
+                    # Product.save(): one allocation per product.
+                    for _ in range(self.per_thread):
+                        Product.objects.create(seller=seller, name="Lamp", price=1)
+                else:
+                    # Import path: one allocation for the batch.
+                    slugs = allocate_slugs(["Lamp"] * self.per_thread)
+                    Product.objects.bulk_create([Product(seller=seller, name="Lamp", price=1, slug=slug) for slug in slugs])
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(self.threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        slugs = list(Product.objects.values_list("slug", flat=True))
+        self.assertEqual(len(slugs), self.threads * self.per_thread)
+        self.assertEqual(len(set(slugs)), len(slugs))
+
+
+class ReviewRatingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="buyer@example.com", password=None)
+        self.product = Product.objects.create(seller=self.user, name="Lamp", price=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_ratings_out_of_range_are_rejected(self):
+        url = reverse("product-reviews", args=[self.product.slug])
+        for rating in (-3, 0, 6):
+            with self.subTest(rating=rating):
+                response = self.client.post(url, {"rating": rating}, format="json")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("rating", response.data)
+        self.assertEqual(self.client.post(url, {"rating": 4}, format="json").status_code, 201)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating_sum), (1, 4))
+
+    def test_drifted_aggregates_do_not_block_deletes(self):
+        # bulk_create sends no signals, so the stored aggregates stay at zero.
+        ProductReview.objects.bulk_create([ProductReview(product=self.product, user=self.user, rating=5)])
+        self.product.delete()
+        self.assertFalse(Product.objects.filter(pk=self.product.pk).exists())
+
+
+class CatalogImportExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(email="seller@example.com", password=None, is_seller=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+
+    def test_products_named_like_the_endpoints_are_reachable(self):
+        for name in ("Import", "Export"):
+            product = Product.objects.create(seller=self.seller, name=name, price=1)
+            self.assertEqual(product.slug, name.lower())
+            response = self.client.get(reverse("product-detail", args=[product.slug]))
+            self.assertEqual((response.status_code, response.data["name"]), (200, name))
+
+    def test_import_then_export(self):
+        upload = SimpleUploadedFile("products.csv", b"name,price,stock,category,variants\nLamp,12.50,3,Lighting,Red:13.00:2\n")
+        response = self.client.post(reverse("product-import"), {"file": upload}, format="multipart")
+        self.assertEqual((response.status_code, response.data["products"], response.data["variants"]), (201, 1, 1))
+
+        response = self.client.get(reverse("product-export"), {"type": "jsonl"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'"name": "Lamp"', b"".join(response.streaming_content))
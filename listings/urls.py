@@ -9,9 +9,15 @@ urlpatterns = [
     # Products
     path("products/", views.product_list_create, name="product-list-create"),
     path("products/<slug:slug>/", views.product_detail, name="product-detail"),
+    path("products/<slug:slug>/page/", views.product_page, name="product-page"),
     path("products/<slug:slug>/description/", views.product_description, name="product-description"),
     path("products/<slug:slug>/images/", views.product_images, name="product-images"),
 
+    # Bulk catalogue import/export; kept off products/ so they can't shadow
+    # products slugged "import" or "export".
+    path("catalog/import/", views.product_import, name="product-import"),
+    path("catalog/export/", views.product_export, name="product-export"),
+
     # Product Reviews
     path("products/<slug:slug>/reviews/", views.product_reviews, name="product-reviews"),
     #stock
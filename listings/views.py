@@ -3,10 +3,30 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticate
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-
-from .models import Category, Product, ProductImage
-from .serializers import CategorySerializer, ProductSerializer, ProductImageSerializer
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from marketplace.pagination import KeysetPagination, get_paginator
+from marketplace.routers import replica_reads
+from marketplace.serializers import parse_fields, sparse_options
+from .models import Category, Product, ProductImage, ProductReview, ProductVariant, Wishlist
+from .serializers import (
+    CategorySerializer,
+    ProductSerializer,
+    ProductImageSerializer,
+    ProductImageUploadSerializer,
+    ProductReviewSerializer,
+    ProductVariantSerializer,
+    WishlistSerializer,
+)
+from .search import get_search_backend
+from .cache import bump_products, cached_response, get_product_id, product_namespace
+from .images import schedule_processing
+from .catalog import CONTENT_TYPES, FORMATS, export_lines, guess_format, import_products, read_rows
 
 
 # ---------------------------
@@ -14,11 +34,12 @@ from .serializers import CategorySerializer, ProductSerializer, ProductImageSeri
 # ---------------------------
 @api_view(["GET", "POST"])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@replica_reads
 def category_list_create(request):
     if request.method == "GET":
-        categories = Category.objects.all()
-        serializer = CategorySerializer(categories, many=True)
-        return Response(serializer.data)
+        def render():
+            return CategorySerializer(Category.objects.all(), many=True).data
+        return cached_response(request, "categories", render)
 
     elif request.method == "POST":
         serializer = CategorySerializer(data=request.data)
@@ -52,32 +73,27 @@ def category_detail(request, pk):
 # ---------------------------
 # PRODUCT VIEWS
 # ---------------------------
-@api_view(["GET", "POST"])
-@permission_classes([IsAuthenticatedOrReadOnly])
-def product_list_create(request):
-    if request.method == "GET":
-        products = Product.objects.all()
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
-
-    elif request.method == "POST":
-        serializer = ProductSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save(seller=request.user)  # assign seller automatically
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-
 @api_view(["GET", "PUT", "DELETE"])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@replica_reads
 def product_detail(request, slug):
-    product = get_object_or_404(Product, slug=slug)
-
     if request.method == "GET":
-        serializer = ProductSerializer(product)
-        return Response(serializer.data)
-
-    elif request.method == "PUT":
+        product_id = get_product_id(
+            slug, lambda: Product.objects.filter(slug=slug).values_list("pk", flat=True).first()
+        )
+        if product_id is None:
+            raise Http404
+
+        def render():
+            # ?fields= / ?expand= (e.g. ?expand=category) also narrow the SELECT.
+            sparse = sparse_options(request)
+            products = ProductSerializer(**sparse).narrow_queryset(Product.objects.all())
+            return ProductSerializer(get_object_or_404(products, pk=product_id), **sparse).data
+        return cached_response(request, product_namespace(product_id), render)
+
+    product = get_object_or_404(ProductSerializer.setup_eager_loading(Product.objects.all()), slug=slug)
+
+    if request.method == "PUT":
         serializer = ProductSerializer(product, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save(seller=request.user)
@@ -89,6 +105,76 @@ def product_detail(request, slug):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+PRODUCT_PAGE_SECTIONS = ("product", "variants", "images", "reviews")
+PRODUCT_PAGE_REVIEWS = 10
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@replica_reads
+def product_page(request, slug):
+    """
+    Everything a product page shows in one response: the product, its
+    variants and images, and the first page of reviews with the rating
+    aggregates. ``?fields=`` picks sections and the fields inside them, e.g.
+    ``?fields=product.name,product.price,variants,reviews.rating``.
+    At most four queries (plus the cached slug lookup); sections left out
+    are not queried.
+    """
+    product_id = get_product_id(
+        slug, lambda: Product.objects.filter(slug=slug).values_list("pk", flat=True).first()
+    )
+    if product_id is None:
+        raise Http404
+    fields = parse_fields(request.GET.get("fields"))
+    sections = {name: fields.get(name, {}) for name in PRODUCT_PAGE_SECTIONS if not fields or name in fields}
+
+    def render():
+        products = Product.objects.select_related("seller", "category")
+        if "variants" in sections:
+            products = products.prefetch_related(Prefetch("variants", ProductVariant.objects.order_by("id")))
+        if "images" in sections:
+            products = products.prefetch_related(Prefetch("images", ProductImage.objects.order_by("id")))
+        product = get_object_or_404(products, pk=product_id)
+
+        data = {}
+        if "product" in sections:
+            # Images have their own section.
+            product_fields = sections["product"] or {
+                name: {} for name in ProductSerializer.Meta.fields if name != "images"
+            }
+            data["product"] = ProductSerializer(product, fields=product_fields).data
+        if "variants" in sections:
+            data["variants"] = ProductVariantSerializer(
+                product.variants.all(), many=True, fields=sections["variants"]
+            ).data
+        if "images" in sections:
+            data["images"] = ProductImageSerializer(product.images.all(), many=True, fields=sections["images"]).data
+        if "reviews" in sections:
+            reviews = list(
+                ProductReview.objects.filter(product_id=product_id).select_related("user")
+                .order_by("-created_at", "-id")[:PRODUCT_PAGE_REVIEWS + 1]
+            )
+            next_link = None
+            if len(reviews) > PRODUCT_PAGE_REVIEWS:
+                reviews = reviews[:PRODUCT_PAGE_REVIEWS]
+                # Later pages come from the reviews endpoint in cursor mode.
+                query = urlencode({
+                    "pagination": "cursor",
+                    "page_size": PRODUCT_PAGE_REVIEWS,
+                    "cursor": KeysetPagination().encode_cursor(reviews[-1]),
+                })
+                next_link = request.build_absolute_uri(f"{reverse('product-reviews', args=[product.slug])}?{query}")
+            data["reviews"] = {
+                "count": product.rating_count,
+                "average_rating": product.rating_avg,
+                "next": next_link,
+                "results": ProductReviewSerializer(reviews, many=True, fields=sections["reviews"]).data,
+            }
+        return data
+    return cached_response(request, product_namespace(product_id), render)
+
+
 # ---------------------------
 # PRODUCT IMAGE VIEWS
 # ---------------------------
@@ -104,11 +190,16 @@ def product_images(request, slug):
         return Response(serializer.data)
 
     elif request.method == "POST":
-        files = request.FILES.getlist("images")
-        images = []
-        for file in files:
-            img = ProductImage.objects.create(product=product, image=file)
-            images.append(img)
+        upload = ProductImageUploadSerializer(data={"images": request.FILES.getlist("images")})
+        if not upload.is_valid():
+            return Response(upload.errors, status=status.HTTP_400_BAD_REQUEST)
+        # Store the uploads in one INSERT; thumbnails are made in the background.
+        with transaction.atomic():
+            images = ProductImage.objects.bulk_create([
+                ProductImage(product=product, image=file) for file in upload.validated_data["images"]
+            ])
+            bump_products([product.pk])
+            schedule_processing(image.pk for image in images)
         serializer = ProductImageSerializer(images, many=True)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -139,7 +230,6 @@ def product_description(request, slug):
 
 
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q, Avg
 
 # Custom Pagination
 class ProductPagination(PageNumberPagination):
@@ -147,29 +237,57 @@ class ProductPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 50
 
+
+PRODUCT_ORDERING = {
+    "rating": ("rating_avg", "id"),
+    "-rating": ("-rating_avg", "-id"),
+    "newest": ("-created_at", "-id"),
+}
+
+
+class WishlistKeysetPagination(KeysetPagination):
+    ordering_field = "added_at"
+
 # ---------------------------
 # PRODUCT LIST WITH SEARCH & FILTER
 # ---------------------------
 @api_view(["GET", "POST"])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@replica_reads
 def product_list_create(request):
     if request.method == "GET":
-        queryset = Product.objects.all()
+        # ?fields=id,name,price skips descriptions (and their column) in grids.
+        sparse = sparse_options(request)
+        queryset = ProductSerializer(**sparse).narrow_queryset(Product.objects.all(), "created_at")
 
         # Search
         search = request.GET.get("search")
         if search:
-            queryset = queryset.filter(Q(name__icontains=search) | Q(description__icontains=search))
+            queryset = get_search_backend().search(queryset, search)
+        else:
+            queryset = queryset.order_by("-created_at", "-id")
 
         # Filter by category
         category_id = request.GET.get("category")
         if category_id:
             queryset = queryset.filter(category_id=category_id)
 
-        # Pagination
-        paginator = ProductPagination()
+        # Filter / sort by the stored rating aggregates
+        min_rating = request.GET.get("min_rating")
+        if min_rating:
+            try:
+                queryset = queryset.filter(rating_avg__gte=float(min_rating))
+            except ValueError:
+                return Response({"error": "Invalid min_rating"}, status=status.HTTP_400_BAD_REQUEST)
+
+        ordering = request.GET.get("ordering")
+        if ordering in PRODUCT_ORDERING:
+            queryset = queryset.order_by(*PRODUCT_ORDERING[ordering])
+
+        # Pagination (?pagination=cursor switches to keyset mode)
+        paginator = get_paginator(request, ProductPagination)
         page = paginator.paginate_queryset(queryset, request)
-        serializer = ProductSerializer(page, many=True)
+        serializer = ProductSerializer(page, many=True, **sparse)
         return paginator.get_paginated_response(serializer.data)
 
     elif request.method == "POST":
@@ -179,18 +297,72 @@ def product_list_create(request):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+# ---------------------------
+# BULK IMPORT / EXPORT
+# ---------------------------
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser])
+def product_import(request):
+    """
+    Expects multipart payload:
+    {
+        "file": <products.csv or products.jsonl>,
+        "type": "csv" | "jsonl",   # optional, guessed from the file name
+        "dry_run": "true"          # optional, validate without saving
+    }
+    """
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response({"error": "file is required"}, status=status.HTTP_400_BAD_REQUEST)
+    fmt = request.data.get("type") or guess_format(upload.name)
+    if fmt not in FORMATS:
+        return Response({"error": f"type must be one of {', '.join(FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+
+    result = import_products(read_rows(upload.file, fmt), request.user.pk, dry_run=dry_run)
+    created = result.products and not dry_run
+    return Response(result.as_dict(), status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def product_export(request):
+    """Stream the caller's products (every product for staff) as ?type=csv|jsonl."""
+    fmt = request.GET.get("type", "csv")
+    if fmt not in FORMATS:
+        return Response({"error": f"type must be one of {', '.join(FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    products = Product.objects.all()
+    if not request.user.is_staff:
+        products = products.filter(seller_id=request.user.pk)
+
+    response = StreamingHttpResponse(export_lines(products, fmt), content_type=CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = f'attachment; filename="products.{fmt}"'
+    return response
+
+
 # ---------------------------
 # PRODUCT REVIEWS
 # ---------------------------
 @api_view(["GET", "POST"])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@replica_reads
 def product_reviews(request, slug):
     product = get_object_or_404(Product, slug=slug)
 
     if request.method == "GET":
-        reviews = ProductReview.objects.filter(product=product)
+        reviews = ProductReview.objects.filter(product=product).select_related("user")
+        average = product.rating_avg
+        paginator = get_paginator(request)
+        if paginator is not None:
+            page = paginator.paginate_queryset(reviews, request)
+            serializer = ProductReviewSerializer(page, many=True)
+            return Response({
+                "average_rating": average or 0,
+                "next": paginator.get_next_link(),
+                "reviews": serializer.data,
+            })
         serializer = ProductReviewSerializer(reviews, many=True)
-        average = reviews.aggregate(avg_rating=Avg("rating"))["avg_rating"]
         return Response({"average_rating": average or 0, "reviews": serializer.data})
 
     elif request.method == "POST":
@@ -234,8 +406,15 @@ def product_variant_list_create(request, slug):
 @permission_classes([IsAuthenticated])
 def wishlist_view(request):
     if request.method == "GET":
-        wishlist = Wishlist.objects.filter(user=request.user)
-        serializer = WishlistSerializer(wishlist, many=True)
+        # ?expand=product nests the products; ?fields= trims either level.
+        sparse = sparse_options(request)
+        wishlist = WishlistSerializer(**sparse).narrow_queryset(Wishlist.objects.filter(user_id=request.user.pk), "added_at")
+        paginator = get_paginator(request, keyset_class=WishlistKeysetPagination)
+        if paginator is not None:
+            page = paginator.paginate_queryset(wishlist, request)
+            serializer = WishlistSerializer(page, many=True, **sparse)
+            return paginator.get_paginated_response(serializer.data)
+        serializer = WishlistSerializer(wishlist, many=True, **sparse)
         return Response(serializer.data)
 
     elif request.method == "POST":
@@ -243,12 +422,12 @@ def wishlist_view(request):
         if not product_id:
             return Response({"error": "Product ID required"}, status=status.HTTP_400_BAD_REQUEST)
         product = get_object_or_404(Product, id=product_id)
-        wishlist_item, created = Wishlist.objects.get_or_create(user=request.user, product=product)
+        wishlist_item, created = Wishlist.objects.get_or_create(user_id=request.user.pk, product=product)
         serializer = WishlistSerializer(wishlist_item)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     elif request.method == "DELETE":
         product_id = request.data.get("product")
         product = get_object_or_404(Product, id=product_id)
-        Wishlist.objects.filter(user=request.user, product=product).delete()
+        Wishlist.objects.filter(user_id=request.user.pk, product=product).delete()
         return Response({"success": "Removed from wishlist"}, status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,65 @@
+"""
+SQLite setup for running the app under several worker processes.
+
+``sqlite_database()`` builds a ``DATABASES`` entry and the
+``connection_created`` receiver below applies its pragmas to every new
+connection. Settings import this module, so the receiver is always wired.
+"""
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Applied in this order to each new SQLite connection. Override per alias
+# with a "PRAGMAS" key in its DATABASES entry.
+DEFAULT_PRAGMAS = {
+    # Readers no longer block the writer (and vice versa).
+    "journal_mode": "WAL",
+    # Safe with WAL: a power loss may drop the last commits, never corrupt.
+    "synchronous": "NORMAL",
+    # Wait up to 5s for the write lock instead of failing straight away.
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -20000,  # negative = KiB, i.e. ~20 MB per connection
+    "temp_store": "MEMORY",
+}
+
+
+def sqlite_database(path, read_only=False, replica=False, conn_max_age=600, pragmas=None):
+    """
+    A ``DATABASES`` entry for the SQLite file at ``path``.
+
+    Connections persist for ``conn_max_age`` seconds (health-checked before
+    reuse) and write transactions start with BEGIN IMMEDIATE, so concurrent
+    writers queue on ``busy_timeout`` instead of failing with "database is
+    locked" when a read lock cannot be upgraded. ``read_only`` opens the file
+    in ``mode=ro`` for an alias that only serves reads. ``replica`` marks a
+    read-only copy of the primary for ``marketplace.routers.ReplicaRouter``
+    (kept in sync by ``manage.py sync_replicas``).
+    """
+    read_only = read_only or replica
+    entry = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"file:{path}?mode=ro" if read_only else path,
+        "CONN_MAX_AGE": conn_max_age,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+        "PRAGMAS": {**DEFAULT_PRAGMAS, **(pragmas or {})},
+    }
+    if read_only:
+        # WAL mode is a property of the file; the writer sets it.
+        entry["PRAGMAS"].pop("journal_mode", None)
+        entry["PRAGMAS"]["query_only"] = "ON"
+        entry["OPTIONS"] = {}
+        entry["TEST"] = {"MIRROR": "default"}
+    if replica:
+        entry["REPLICA"] = True
+    return entry
+
+
+@receiver(connection_created)
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    pragmas = connection.settings_dict.get("PRAGMAS", {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,104 @@
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over ``(ordering_field, id)``, newest first.
+
+    Each page is a single indexed range scan: no COUNT(*) and no OFFSET, so
+    page 1000 costs the same as page 1. Only a ``next`` link is returned,
+    which is what infinite-scroll clients need. Querysets already ordered
+    some other way (a sort option, search ranking) are rejected with a 400
+    rather than silently re-sorted.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+    cursor_query_param = "cursor"
+    ordering_field = "created_at"
+    invalid_cursor_message = "Invalid cursor"
+    unsupported_ordering_message = "Cursor pagination only supports the default newest-first ordering."
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, instance):
+        value = getattr(instance, self.ordering_field)
+        raw = f"{value.isoformat()}|{instance.pk}"
+        return b64encode(raw.encode("ascii")).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk = b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+            position = parse_datetime(value), int(pk)
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        field = self.ordering_field
+
+        ordering = (f"-{field}", "-id")
+        current = tuple(queryset.query.extra_order_by or queryset.query.order_by)
+        if current and current != ordering:
+            raise ValidationError({"pagination": [self.unsupported_ordering_message]})
+        queryset = queryset.order_by(*ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            value, pk = position
+            # The leading `field <= value` keeps this a range scan on the index.
+            queryset = queryset.filter(
+                Q(**{f"{field}__lte": value}),
+                Q(**{f"{field}__lt": value}) | Q(id__lt=pk),
+            )
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+
+def get_paginator(request, pagination_class=None, keyset_class=KeysetPagination):
+    """
+    Pick the paginator for a list endpoint.
+
+    Clients opt into keyset mode with ``?pagination=cursor`` (the ``next``
+    links carry it along). Otherwise ``pagination_class`` is used, or
+    ``None`` for endpoints that return unpaginated lists by default.
+    """
+    if request.query_params.get("pagination") == "cursor":
+        return keyset_class()
+    if pagination_class is None:
+        return None
+    return pagination_class()
@@ -0,0 +1,129 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+READ_ONLY_ALIAS = "readonly"
+
+# Seconds a replica may trail the primary. Users who wrote within this
+# window read from the primary so they see their own changes.
+REPLICA_LAG_WINDOW = getattr(settings, "REPLICA_LAG_WINDOW", 5)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+class ReadOnlyRouter:
+    """
+    Send reads to the ``readonly`` alias (the same SQLite file opened
+    ``mode=ro``) when it is configured, and every write to ``default``.
+
+    Reads issued inside a transaction on ``default`` stay there so they see
+    the transaction's own uncommitted writes; outside one, a committed write
+    is visible to the read-only connection immediately.
+    """
+
+    def db_for_read(self, model, **hints):
+        if READ_ONLY_ALIAS not in connections.settings:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return READ_ONLY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or instances read via READ_ONLY_ALIAS would save there.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same database.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db != READ_ONLY_ALIAS
+
+
+def replica_aliases():
+    """Aliases whose DATABASES entry is marked ``"REPLICA": True``."""
+    return [alias for alias, entry in connections.settings.items() if entry.get("REPLICA")]
+
+
+class ReplicaRouter(ReadOnlyRouter):
+    """
+    ReadOnlyRouter that also serves reads from replicas, but only inside
+    views decorated with ``replica_reads`` (the catalogue read paths).
+    Everything else, including checkout, orders and auth, reads from the
+    primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return super().db_for_read(model, **hints)
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get their schema from the primary.
+        if connections.settings[db].get("REPLICA"):
+            return False
+        return super().allow_migrate(db, app_label, **hints)
+
+
+@contextmanager
+def _reads_from_replicas(allowed):
+    token = _replica_reads.set(allowed)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def primary_reads():
+    """Force primary reads for a block, e.g. while data is fresher than replicas."""
+    return _reads_from_replicas(False)
+
+
+def _pin_key(user_id):
+    return f"db:primary-pin:{user_id}"
+
+
+def pin_to_primary(user):
+    if user is not None and user.is_authenticated:
+        cache.set(_pin_key(user.pk), True, REPLICA_LAG_WINDOW)
+
+
+def is_pinned_to_primary(user):
+    return user.is_authenticated and cache.get(_pin_key(user.pk)) is not None
+
+
+def replica_reads(view):
+    """
+    Let a view's safe requests read from replicas, unless the user wrote
+    something within REPLICA_LAG_WINDOW (read-your-writes). Apply beneath
+    ``@api_view`` so ``request.user`` is the authenticated user.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS or is_pinned_to_primary(request.user):
+            return view(request, *args, **kwargs)
+        with _reads_from_replicas(True):
+            return view(request, *args, **kwargs)
+    return wrapped
+
+
+class ReadYourWritesMiddleware:
+    """Pins a user's replica-eligible reads to the primary after a successful write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(getattr(request, "user", None))
+        return response
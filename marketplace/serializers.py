@@ -0,0 +1,249 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+
+
+class EagerLoadingListSerializer(serializers.ListSerializer):
+    """
+    List serializer that applies the child's eager loading to querysets
+    before iterating them.
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, (models.Manager, models.QuerySet)):
+            queryset = data.all()
+            # Prefetched related managers already hold their rows.
+            if queryset._result_cache is None:
+                data = self.child.setup_eager_loading(queryset)
+        return super().to_representation(data)
+
+
+class EagerLoadingMixin:
+    """
+    Lets a serializer declare the relations it renders so every queryset it
+    serializes is loaded in a constant number of queries.
+
+        select_related_fields   -> forward FKs / one-to-ones rendered directly
+        prefetch_related_fields -> reverse FKs / many-to-many rendered directly
+
+    Nested serializers using this mixin are picked up automatically and their
+    lookups are prefixed with the field source.
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {}
+        for key in serializers.LIST_SERIALIZER_KWARGS_REMOVE:
+            value = kwargs.pop(key, None)
+            if value is not None:
+                list_kwargs[key] = value
+        list_kwargs["child"] = cls(*args, **kwargs)
+        list_kwargs.update({
+            key: value for key, value in kwargs.items()
+            if key in serializers.LIST_SERIALIZER_KWARGS
+        })
+        meta = getattr(cls, "Meta", None)
+        list_serializer_class = getattr(meta, "list_serializer_class", EagerLoadingListSerializer)
+        return list_serializer_class(*args, **list_kwargs)
+
+    @classmethod
+    def get_eager_loading(cls, prefix=""):
+        """
+        Return ``(select_related, prefetch_related)`` lookups for this
+        serializer and the nested serializers it declares.
+        """
+        select = [prefix + field for field in cls.select_related_fields]
+        prefetch = [prefix + field for field in cls.prefetch_related_fields]
+
+        for name, field in cls._declared_fields.items():
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            if not isinstance(nested, EagerLoadingMixin):
+                continue
+            source = (field.source or name).replace(".", "__")
+            nested_select, nested_prefetch = nested.get_eager_loading(prefix + source + "__")
+            if many:
+                prefetch.append(prefix + source)
+                prefetch.extend(nested_select + nested_prefetch)
+            else:
+                select.append(prefix + source)
+                select.extend(nested_select)
+                prefetch.extend(nested_prefetch)
+
+        return select, prefetch
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select, prefetch = cls.get_eager_loading()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+def parse_fields(value):
+    """
+    Parse a ``?fields=`` value into a nested dict of field names, e.g.
+    ``"name,variants.price"`` -> ``{"name": {}, "variants": {"price": {}}}``.
+    An empty dict means "every field"; a bare name wins over dotted ones.
+    """
+    tree = {}
+    whole = set()
+    for path in filter(None, (part.strip() for part in (value or "").split(","))):
+        node = tree
+        names = path.split(".")
+        for depth, name in enumerate(names):
+            prefix = ".".join(names[:depth + 1])
+            if prefix in whole:
+                break
+            if depth == len(names) - 1:
+                node[name] = {}
+                whole.add(prefix)
+            else:
+                node = node.setdefault(name, {})
+    return tree
+
+
+def is_requested(fields, *path):
+    """Whether the field at ``path`` survives a ``parse_fields`` tree."""
+    for name in path:
+        if not fields:
+            return True
+        if name not in fields:
+            return False
+        fields = fields[name]
+    return True
+
+
+def sparse_options(request):
+    """``fields``/``expand`` kwargs for a SparseFieldsMixin serializer from the query string."""
+    return {
+        "fields": parse_fields(request.query_params.get("fields")),
+        "expand": parse_fields(request.query_params.get("expand")),
+    }
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets and opt-in expansion, driven by ``?fields=``/``?expand=``
+    (see ``sparse_options``).
+
+        fields             -> keep only these fields (nested with dots)
+        expand             -> render the relations named in ``expandable_fields``
+                              with the given serializer instead of their default
+        expandable_fields  -> {name: (serializer class, kwargs)}
+        projection_fields  -> {name: [model lookups]} for fields whose columns
+                              can't be worked out from their source, such as
+                              SerializerMethodFields
+
+    ``narrow_queryset()`` then loads just the columns and relations the
+    remaining fields render, via ``.only()``, ``select_related`` and
+    ``Prefetch``. Unknown names are ignored.
+    """
+
+    expandable_fields = {}
+    projection_fields = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if expand:
+            self.expand_fields(expand)
+        if fields:
+            self.restrict_fields(fields)
+
+    def _nested_serializer(self, name):
+        field = self.fields[name]
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        return nested if isinstance(nested, SparseFieldsMixin) else None
+
+    def expand_fields(self, tree):
+        for name, subtree in tree.items():
+            if name not in self.fields:
+                continue
+            if name in self.expandable_fields:
+                serializer_class, options = self.expandable_fields[name]
+                if subtree and issubclass(serializer_class, SparseFieldsMixin):
+                    options = {**options, "expand": subtree}
+                self.fields[name] = serializer_class(read_only=True, **options)
+            elif subtree and self._nested_serializer(name):
+                self._nested_serializer(name).expand_fields(subtree)
+
+    def restrict_fields(self, tree):
+        for name in list(self.fields):
+            if name not in tree:
+                self.fields.pop(name)
+        for name, subtree in tree.items():
+            if subtree and name in self.fields and self._nested_serializer(name):
+                self._nested_serializer(name).restrict_fields(subtree)
+
+    def get_projection(self, prefix=""):
+        """
+        ``(only, select_related, prefetch_related)`` for the fields this
+        instance renders, with lookups prefixed by ``prefix``. ``only`` is
+        None if some field's columns are unknown.
+        """
+        model = getattr(getattr(self, "Meta", None), "model", None)
+        if model is None:
+            return None, [], []
+        only = [prefix + model._meta.pk.name]
+        select, prefetch = [], []
+        complete = True
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if name in self.projection_fields:
+                only.extend(prefix + lookup for lookup in self.projection_fields[name])
+                continue
+            try:
+                model_field = model._meta.get_field(field.source.split(".")[0])
+            except FieldDoesNotExist:
+                complete = False  # "*" or a property: no way to tell
+                continue
+            path = prefix + model_field.name
+            nested = self._nested_serializer(name)
+            if model_field.one_to_many or model_field.many_to_many:
+                prefetch.append(self._prefetch(model_field, path, nested))
+            elif not model_field.is_relation or isinstance(field, serializers.PrimaryKeyRelatedField):
+                only.append(path)  # a column, or just the foreign key
+            else:
+                # Rendered from the related object: join it in.
+                only.append(path)
+                select.append(path)
+                if nested is not None:
+                    nested_only, nested_select, nested_prefetch = nested.get_projection(path + "__")
+                    only.extend(nested_only or [])
+                    select.extend(nested_select)
+                    prefetch.extend(nested_prefetch)
+        return (only if complete else None), select, prefetch
+
+    @staticmethod
+    def _prefetch(model_field, path, nested):
+        related = model_field.related_model
+        queryset = related._default_manager.order_by(related._meta.pk.name)
+        if nested is not None:
+            # The prefetch matches rows to their parent on the foreign key.
+            required = [model_field.field.name] if model_field.one_to_many else []
+            queryset = nested.narrow_queryset(queryset, *required)
+        return models.Prefetch(path, queryset=queryset)
+
+    def narrow_queryset(self, queryset, *required):
+        """
+        Restrict ``queryset`` to what this serializer renders. ``required``
+        names columns the caller needs regardless (e.g. a keyset ordering
+        field).
+        """
+        only, select, prefetch = self.get_projection()
+        if only is None:
+            # Fall back to the serializer's declared eager loading, if any.
+            if isinstance(self, EagerLoadingMixin):
+                return self.setup_eager_loading(queryset)
+            return queryset.select_related(*select).prefetch_related(*prefetch)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset.only(*dict.fromkeys(only + list(required)))
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from marketplace.database import sqlite_database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -53,6 +56,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'cart.resolution.CartMiddleware',
+    'marketplace.routers.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,12 +86,41 @@ WSGI_APPLICATION = 'marketplace.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# WAL, busy timeout and persistent connections; see marketplace/database.py.
+# With SQLITE_READ_CONNECTION=1 reads go to a read-only connection on the
+# same file. Catalogue reads go to any aliases marked as replicas
+# (marketplace/routers.py), e.g.
+#     'replica1': sqlite_database(BASE_DIR / 'replica1.sqlite3', replica=True),
+# kept in sync locally with `manage.py sync_replicas --interval 1`.
+# Both are opt-in; without them every query uses 'default'.
+
 DATABASES = {
+    'default': sqlite_database(BASE_DIR / 'db.sqlite3'),
+}
+# On disk rather than in memory so the concurrency tests get real
+# connections per thread.
+DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
+if os.environ.get('SQLITE_READ_CONNECTION') == '1':
+    DATABASES['readonly'] = sqlite_database(BASE_DIR / 'db.sqlite3', read_only=True)
+DATABASE_ROUTERS = ['marketplace.routers.ReplicaRouter']
+
+# Seconds a replica may lag; writers read from the primary for this long.
+REPLICA_LAG_WINDOW = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Per-process locmem by default; point at Redis/Memcached when running
+# several workers so listings cache invalidations are shared.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'marketplace',
     }
 }
+LISTINGS_CACHE_ALIAS = 'default'
+LISTINGS_CACHE_TIMEOUT = 300
 
 
 # Password validation
@@ -134,12 +168,21 @@ CORS_ALLOW_ALL_ORIGINS = True
 AUTH_USER_MODEL = "accounts.User"
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-        
+        "accounts.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    # orjson-backed when installed, DRF's stdlib versions otherwise.
+    "DEFAULT_RENDERER_CLASSES": (
+        "marketplace.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "marketplace.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -147,10 +190,15 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": False,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.UserClaimsTokenRefreshSerializer",
 }
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Product image renditions (listings/images.py)
+PRODUCT_IMAGE_WIDTHS = (160, 320, 640, 1280)
+IMAGE_PROCESSING_WORKERS = 2
+
 # from decouple import config
 
 # PAYSTACK_SECRET_KEY = config('PAYSTACK_SECRET_KEY')
@@ -158,3 +206,8 @@ MEDIA_ROOT = BASE_DIR / "media"
 PAYSTACK_PUBLIC_KEY = 'pk_test_ba6445195c7557b64f6c040a4f9260b5dc7103a8'
 PAYSTACK_SECRET_KEY = 'sk_test_895f2ab861d5b795b4fe5eb79a01b9b593446e57'
 PAYSTACK_CURRENCY = 'NGN'
+# Point at `python manage.py paystack_stub` to run payments offline
+PAYSTACK_BASE_URL = 'https://api.paystack.co'
+PAYSTACK_CONNECT_TIMEOUT = 3.05
+PAYSTACK_READ_TIMEOUT = 10
+PAYSTACK_MAX_RETRIES = 2
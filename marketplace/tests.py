@@ -0,0 +1,65 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest import skipIf
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from listings.models import Category, Product
+from .parsers import ORJSONParser
+from .renderers import ORJSONRenderer, orjson
+
+
+@skipIf(orjson is None, "orjson is not installed")
+class ORJSONRendererTests(SimpleTestCase):
+    def assertSameJSON(self, data):
+        self.assertEqual(ORJSONRenderer().render(data, "application/json"), JSONRenderer().render(data, "application/json"))
+
+    def test_matches_the_stdlib_renderer(self):
+        self.assertSameJSON({
+            "price": Decimal("1234.50"),
+            "created_at": datetime.datetime(2025, 1, 2, 3, 4, 5, 678900, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2025, 1, 2),
+            "id": uuid.UUID(int=1),
+            "name": "Lamp – “quoted” ünïcode \u2028\u2029",
+            "nested": [{"a": None, "b": True, "c": 1.5}, []],
+            1: "integer key",
+        })
+
+    def test_falls_back_for_oversized_integers(self):
+        self.assertSameJSON({"big": 2 ** 70})
+
+    def test_parses_what_it_renders(self):
+        data = {"name": "ünïcode", "items": [1, 2.5, None]}
+        content = ORJSONRenderer().render(data, "application/json")
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(content)), data)
+        self.assertEqual(JSONParser().parse(io.BytesIO(content)), data)
+
+    def test_rejects_malformed_json(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b"{not json"))
+
+    def test_other_charsets_use_the_stdlib_parser(self):
+        content = '{"name": "café"}'.encode("latin-1")
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(content), parser_context={"encoding": "latin-1"}), {"name": "café"})
+
+
+@skipIf(orjson is None, "orjson is not installed")
+class ORJSONResponseTests(TestCase):
+    def test_api_responses_match_the_stdlib_renderer(self):
+        seller = User.objects.create_user(email="seller@example.com", password=None)
+        category = Category.objects.create(name="Lamps")
+        Product.objects.bulk_create([
+            Product(seller=seller, category=category, name=f"Lamp {i} – ünïcode", slug=f"lamp-{i}", price="1234.50")
+            for i in range(20)
+        ])
+        response = APIClient().get(reverse("product-list-create"), {"page_size": 20})
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data, "application/json"))
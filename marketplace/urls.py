@@ -8,6 +8,7 @@ urlpatterns = [
     path("api/accounts/", include("accounts.urls")),
     path('api/marketplace/', include('listings.urls')),
     path("api/orders/", include("orders.urls")),
+    path("api/cart/", include("cart.urls")),
 
 
 ]
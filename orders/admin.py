@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderItem, Payment, ShippingAddress
+from .models import Notification, Order, OrderItem, Payment, ShippingAddress
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
@@ -9,12 +9,20 @@ class OrderAdmin(admin.ModelAdmin):
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
-    list_display = ("order", "product", "quantity", "price")
+    list_display = ("order", "product_name", "variant_name", "quantity", "price")
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
-    list_display = ("order", "reference", "amount", "status")
+    list_display = ("order", "reference", "amount", "status", "created_at")
+    list_filter = ("status",)
 
 @admin.register(ShippingAddress)
 class ShippingAddressAdmin(admin.ModelAdmin):
     list_display = ("order", "user", "address", "city", "country")
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("recipient", "subject", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("recipient", "subject")
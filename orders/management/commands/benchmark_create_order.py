@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from listings.models import Product
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Show that POST /api/orders/create/ runs a constant number of queries "
+        "as the order grows. Seed data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic(), override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"
+            ):
+                self.run(options["sizes"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, sizes):
+        buyer = User.objects.create_user(email="order-bench@example.com", password=None)
+        products = Product.objects.bulk_create(
+            [
+                Product(seller=buyer, name=f"Bench {i}", slug=f"order-bench-{i}", price=10, stock=1000)
+                for i in range(max(sizes))
+            ]
+        )
+        client = APIClient()
+        client.force_authenticate(buyer)
+
+        for size in sizes:
+            payload = {"items": [{"product_id": p.pk, "quantity": 2} for p in products[:size]]}
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.post("/api/orders/create/", payload, format="json")
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{size:>5} lines: HTTP {response.status_code}, "
+                f"{len(queries)} queries, {elapsed * 1000:.1f} ms"
+            )
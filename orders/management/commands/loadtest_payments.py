@@ -0,0 +1,53 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from orders.payments import PaymentGatewayError, PaystackClient
+from orders.paystack_stub import PaystackStub
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the Paystack client (initialize + verify) against the "
+        "in-process stub gateway. No network access needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--latency", type=float, default=0.02)
+        parser.add_argument("--failure-rate", type=float, default=0.0)
+
+    def handle(self, *args, **options):
+        with PaystackStub(latency=options["latency"], failure_rate=options["failure_rate"]) as stub:
+            client = PaystackClient("sk_test_stub", base_url=stub.url, pool_size=options["concurrency"])
+
+            def flow(i):
+                started = time.perf_counter()
+                try:
+                    initialized = client.initialize_transaction(f"buyer{i}@example.com", 1000, {"order_id": i})
+                    client.verify_transaction(initialized["data"]["reference"])
+                except PaymentGatewayError as exc:
+                    return time.perf_counter() - started, type(exc).__name__
+                return time.perf_counter() - started, None
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                results = list(pool.map(flow, range(options["requests"])))
+            elapsed = time.perf_counter() - started
+
+        timings = sorted(duration for duration, _ in results)
+        errors = {}
+        for _, error in results:
+            if error:
+                errors[error] = errors.get(error, 0) + 1
+
+        def percentile(p):
+            return timings[min(len(timings) - 1, int(len(timings) * p))] * 1000
+
+        self.stdout.write(
+            f"{len(results)} payment flows in {elapsed:.2f}s ({len(results) / elapsed:.0f}/s); "
+            f"p50 {percentile(0.5):.1f} ms, p95 {percentile(0.95):.1f} ms, p99 {percentile(0.99):.1f} ms"
+        )
+        self.stdout.write(f"errors: {errors or 'none'}")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from orders.paystack_stub import PaystackStub
+
+
+class Command(BaseCommand):
+    help = "Run a fake Paystack API locally. Set PAYSTACK_BASE_URL to the printed URL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every call.")
+        parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of calls answering 503.")
+        parser.add_argument("--outcome", default="success", choices=["success", "failed", "abandoned"])
+
+    def handle(self, *args, **options):
+        stub = PaystackStub(
+            options["host"], options["port"],
+            latency=options["latency"], failure_rate=options["failure_rate"], outcome=options["outcome"],
+        )
+        self.stdout.write(f"Paystack stub listening on {stub.url}")
+        try:
+            stub.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stub.server_close()
@@ -0,0 +1,69 @@
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from orders.payments import sign_webhook
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay recorded Paystack webhook payloads (one JSON event per line) "
+        "concurrently, each delivered --repeat times, to exercise signature "
+        "checks and idempotency. Posts in-process unless --url is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("payloads", help="JSONL file of webhook events.")
+        parser.add_argument("--url", help="Webhook URL of a running server.")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--repeat", type=int, default=5, help="Deliveries per payload.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["payloads"], "rb") as fh:
+                bodies = [json.dumps(json.loads(line)).encode() for line in fh if line.strip()]
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read payloads: {exc}")
+        deliveries = [body for body in bodies for _ in range(options["repeat"])]
+
+        url = options["url"]
+        if url:
+            session = requests.Session()
+
+            def post(body):
+                response = session.post(
+                    url, data=body, timeout=10,
+                    headers={"Content-Type": "application/json", "X-Paystack-Signature": sign_webhook(body)},
+                )
+                return response.status_code, response.json().get("status")
+        else:
+            path = reverse("paystack-webhook")
+
+            def post(body):
+                try:
+                    response = Client().post(
+                        path, data=body, content_type="application/json",
+                        HTTP_X_PAYSTACK_SIGNATURE=sign_webhook(body),
+                    )
+                    return response.status_code, response.json().get("status")
+                finally:
+                    connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            outcomes = Counter(pool.map(post, deliveries))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"{len(deliveries)} deliveries of {len(bodies)} events in {elapsed:.2f}s")
+        for (code, result), count in sorted(outcomes.items(), key=str):
+            self.stdout.write(f"  HTTP {code} {result}: {count}")
+        processed = outcomes.get((200, "processed"), 0)
+        if processed > len(set(bodies)):
+            raise CommandError(f"{processed} deliveries were processed for {len(set(bodies))} distinct events")
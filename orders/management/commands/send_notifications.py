@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from orders.notifications import claim_batch, close_mail_connection, deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued order notifications from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument("--once", action="store_true", help="Drain what is due and exit.")
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        batch_size = options["batch_size"]
+        total_sent = total_failed = 0
+
+        def work(_):
+            try:
+                sent = failed = 0
+                while True:
+                    batch = claim_batch(batch_size)
+                    if not batch:
+                        return sent, failed
+                    batch_sent, batch_failed = deliver_batch(batch)
+                    sent += batch_sent
+                    failed += batch_failed
+            finally:
+                close_mail_connection()
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                for sent, failed in pool.map(work, range(workers)):
+                    total_sent += sent
+                    total_failed += failed
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {total_sent} notifications, {total_failed} failed or rescheduled"))
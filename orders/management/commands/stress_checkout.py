@@ -0,0 +1,87 @@
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db.models import Sum
+
+from accounts.models import User
+from listings.models import Product, ProductVariant
+from listings.stock import InsufficientStock
+from orders.models import OrderItem
+from orders.services import place_order
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer the stock reservation engine from many threads and verify "
+        "nothing is oversold. Seed rows are committed and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--stock", type=int, default=200)
+        parser.add_argument("--quantity", type=int, default=3)
+
+    def handle(self, *args, **options):
+        threads, stock, quantity = options["threads"], options["stock"], options["quantity"]
+        buyer = User.objects.create_user(email="stress-checkout@example.com", password=None)
+        try:
+            product = Product.objects.create(seller=buyer, name="Stress product", slug="stress-checkout", price=1, stock=stock)
+            variant = ProductVariant.objects.create(product=product, name="Stress variant", price=2, stock=stock)
+            self.run(buyer, product, variant, threads, quantity)
+            self.verify(product, variant, stock)
+        finally:
+            buyer.delete()
+
+    def run(self, buyer, product, variant, threads, quantity):
+        counts = {"placed": 0, "rejected": 0, "locked": 0}
+        lock = threading.Lock()
+        start = threading.Barrier(threads)
+
+        def worker(index):
+            # Alternate between plain product lines, variant lines and both.
+            lines = [
+                [(product, None, quantity)],
+                [(product, variant, quantity)],
+                [(product, None, quantity), (product, variant, quantity)],
+            ][index % 3]
+            start.wait()
+            try:
+                while True:
+                    try:
+                        place_order(buyer, lines)
+                        outcome = "placed"
+                    except InsufficientStock:
+                        outcome = "rejected"
+                    except OperationalError:
+                        outcome = "locked"
+                    with lock:
+                        counts[outcome] += 1
+                    if outcome == "rejected":
+                        return
+            finally:
+                connection.close()
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        self.stdout.write(
+            f"{threads} threads: {counts['placed']} orders placed, "
+            f"{counts['rejected']} rejected for stock, {counts['locked']} lock timeouts"
+        )
+
+    def verify(self, product, variant, stock):
+        product.refresh_from_db()
+        variant.refresh_from_db()
+        sold_product = OrderItem.objects.filter(product=product, variant=None).aggregate(n=Sum("quantity"))["n"] or 0
+        sold_variant = OrderItem.objects.filter(variant=variant).aggregate(n=Sum("quantity"))["n"] or 0
+        for label, sold, remaining in (
+            ("product", sold_product, product.stock),
+            ("variant", sold_variant, variant.stock),
+        ):
+            self.stdout.write(f"{label}: sold {sold} of {stock}, {remaining} left")
+            if sold > stock or sold + remaining != stock:
+                raise CommandError(f"Oversold {label}: sold {sold}, left {remaining}, started with {stock}")
+        self.stdout.write(self.style.SUCCESS("No oversell"))
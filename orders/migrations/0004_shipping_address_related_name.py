@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_line_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='shippingaddress',
+            name='order',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='shipping_address', to='orders.order'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:52
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_snapshots(apps, schema_editor):
+    OrderItem = apps.get_model("orders", "OrderItem")
+    Product = apps.get_model("listings", "Product")
+    ProductVariant = apps.get_model("listings", "ProductVariant")
+    ProductImage = apps.get_model("listings", "ProductImage")
+
+    def column(queryset, field):
+        # "" where the product/variant is gone (SET_NULL), like new rows without one.
+        return Coalesce(Subquery(queryset.values(field)[:1]), Value(""))
+
+    product = Product.objects.filter(pk=OuterRef("product_id"))
+    OrderItem.objects.update(
+        product_name=column(product, "name"),
+        product_slug=column(product, "slug"),
+        variant_name=column(ProductVariant.objects.filter(pk=OuterRef("variant_id")), "name"),
+        product_image=column(ProductImage.objects.filter(product_id=OuterRef("product_id")).order_by("id"), "image"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_notification'),
+        ('listings', '0006_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_image',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_name',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_slug',
+            field=models.SlugField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='variant_name',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
-from listings.models import Product
+from django.utils import timezone
+from listings.models import Product, ProductVariant
 
 User = settings.AUTH_USER_MODEL
 
@@ -18,6 +19,13 @@ class Order(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"], name="order_user_created_id_idx"),
+            models.Index(fields=["user", "status", "created_at", "id"], name="order_user_status_created_idx"),
+            models.Index(fields=["status", "created_at"], name="order_status_created_idx"),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} - {self.user}"
 
@@ -25,11 +33,17 @@ class Order(models.Model):
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True)
+    variant = models.ForeignKey(ProductVariant, on_delete=models.SET_NULL, null=True, blank=True)
     quantity = models.PositiveIntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2)  # Price per item
+    # Snapshot of the product as ordered; order reads never join listings.
+    product_name = models.CharField(max_length=200, blank=True)
+    product_slug = models.SlugField(blank=True)
+    variant_name = models.CharField(max_length=100, blank=True)
+    product_image = models.CharField(max_length=255, blank=True)  # storage path of the primary image
 
     def __str__(self):
-        return f"{self.product.name} x {self.quantity}"
+        return f"{self.product_name or 'Deleted product'} x {self.quantity}"
 
 
 class Payment(models.Model):
@@ -39,13 +53,18 @@ class Payment(models.Model):
     status = models.CharField(max_length=20, choices=[("pending", "Pending"), ("success", "Success"), ("failed", "Failed")], default="pending")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="payment_status_created_idx"),
+        ]
+
     def __str__(self):
         return f"Payment {self.reference} - {self.status}"
 
 
 class ShippingAddress(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    order = models.OneToOneField('Order', on_delete=models.CASCADE)
+    order = models.OneToOneField('Order', on_delete=models.CASCADE, related_name="shipping_address")
     address = models.TextField()
     city = models.CharField(max_length=100)
     postal_code = models.CharField(max_length=20)
@@ -55,3 +74,38 @@ class ShippingAddress(models.Model):
     def __str__(self):
         return f"{self.address}, {self.city}, {self.country}"
 
+
+
+class Notification(models.Model):
+    """
+    Outbox row for an order email. Written in the same transaction as the
+    order change and delivered by the ``send_notifications`` worker.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    # Earliest time the worker may pick the row up: the retry backoff for
+    # pending rows, the lease expiry for rows being sent.
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="notification_due_idx"),
+            models.Index(fields=["claimed_by"], name="notification_claim_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
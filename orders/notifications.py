@@ -0,0 +1,111 @@
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q, Subquery
+from django.utils import timezone
+
+from .models import Notification
+
+MAX_ATTEMPTS = getattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 5)
+RETRY_BASE_DELAY = getattr(settings, "NOTIFICATION_RETRY_BASE_DELAY", 30)  # seconds
+RETRY_MAX_DELAY = getattr(settings, "NOTIFICATION_RETRY_MAX_DELAY", 3600)  # seconds
+LEASE = timedelta(seconds=getattr(settings, "NOTIFICATION_LEASE", 300))
+
+
+def queue_notification(recipient, subject, message):
+    """
+    Add an email to the outbox. Call inside the transaction that makes the
+    change the email is about, so both commit or neither does.
+    """
+    return Notification.objects.create(recipient=recipient, subject=subject, message=message)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2 * base, 4 * base, ... capped."""
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY))
+
+
+def claim_batch(batch_size):
+    """
+    Lease up to ``batch_size`` due notifications to the caller. Rows whose
+    lease expired (a worker died mid-send) become due again.
+
+    The claim is a single UPDATE so concurrent workers never pick up the same
+    row, and SQLite takes the write lock up front instead of upgrading a read.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = Q(status="pending") | Q(status="sending"), Q(next_attempt_at__lte=now)
+    ids = Notification.objects.filter(*due).order_by("next_attempt_at", "id").values("pk")[:batch_size]
+    claimed = Notification.objects.filter(*due, pk__in=Subquery(ids)).update(
+        status="sending", claimed_by=token, next_attempt_at=now + LEASE
+    )
+    if not claimed:
+        return []
+    return list(Notification.objects.filter(claimed_by=token, status="sending"))
+
+
+_local = threading.local()
+
+
+def _get_mail_connection():
+    # One connection per worker thread, reused across batches.
+    if getattr(_local, "connection", None) is None:
+        _local.connection = get_connection()
+        _local.connection.open()
+    return _local.connection
+
+
+def close_mail_connection():
+    connection = getattr(_local, "connection", None)
+    if connection is not None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+    _local.connection = None
+
+
+def deliver_batch(batch):
+    """
+    Send ``batch`` over this thread's pooled mail connection and record the
+    outcome. Failures are rescheduled with backoff until MAX_ATTEMPTS.
+    Returns ``(sent, failed)`` counts.
+    """
+    now = timezone.now()
+    sent, retry = [], []
+    for notification in batch:
+        email = EmailMessage(
+            notification.subject,
+            notification.message,
+            settings.DEFAULT_FROM_EMAIL,
+            [notification.recipient],
+        )
+        try:
+            email.connection = _get_mail_connection()
+            email.send(fail_silently=False)
+        except Exception as exc:
+            # The connection may be broken; reopen it for the next message.
+            close_mail_connection()
+            notification.attempts += 1
+            notification.last_error = f"{type(exc).__name__}: {exc}"
+            if notification.attempts >= MAX_ATTEMPTS:
+                notification.status = "failed"
+            else:
+                notification.status = "pending"
+                notification.next_attempt_at = now + retry_delay(notification.attempts)
+            retry.append(notification)
+        else:
+            notification.attempts += 1
+            notification.status = "sent"
+            notification.sent_at = timezone.now()
+            sent.append(notification)
+
+    if sent:
+        Notification.objects.bulk_update(sent, ["status", "attempts", "sent_at"])
+    if retry:
+        Notification.objects.bulk_update(retry, ["status", "attempts", "next_attempt_at", "last_error"])
+    return len(sent), len(retry)
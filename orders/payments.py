@@ -0,0 +1,155 @@
+import hashlib
+import hmac
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+class PaymentGatewayError(Exception):
+    pass
+
+
+class CircuitOpenError(PaymentGatewayError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing gateway for ``reset_timeout`` seconds after
+    ``failure_threshold`` consecutive failures, then lets a single trial call
+    through (half-open) to decide whether to close again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial_running:
+                raise CircuitOpenError("Payment gateway circuit is open")
+            self.trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class PaystackClient:
+    """
+    Paystack API client sharing one pooled ``requests.Session``.
+
+    Every call has connect/read timeouts. Transient failures (connection
+    errors, 5xx, and read timeouts on GETs) are retried with full-jitter
+    exponential backoff, and repeated failures trip the circuit breaker so a
+    dead gateway fails fast instead of tying up workers.
+    """
+
+    def __init__(self, secret_key, base_url="https://api.paystack.co", timeout=(3.05, 10),
+                 max_retries=2, backoff=0.25, pool_size=20, breaker=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {secret_key}"
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def initialize_transaction(self, email, amount, metadata=None):
+        """``amount`` is in the major unit (naira); Paystack expects kobo."""
+        payload = {"email": email, "amount": int(amount * 100), "metadata": metadata or {}}
+        return self._request("POST", "/transaction/initialize", json=payload)
+
+    def verify_transaction(self, reference):
+        return self._request("GET", f"/transaction/verify/{reference}")
+
+    def _request(self, method, path, **kwargs):
+        self.breaker.before_call()
+        try:
+            data = self._send(method, self.base_url + path, **kwargs)
+        except BaseException:
+            # Whatever went wrong, settle the breaker so a half-open trial
+            # never stays marked as running.
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return data
+
+    def _send(self, method, url, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+                if response.status_code < 500:
+                    return response.json()
+                error = PaymentGatewayError(f"Paystack returned HTTP {response.status_code}")
+            except requests.ConnectionError as exc:
+                error = PaymentGatewayError(f"Could not reach Paystack: {exc}")
+            except requests.Timeout as exc:
+                error = PaymentGatewayError(f"Paystack timed out: {exc}")
+                # A POST that timed out reading may have been applied; don't repeat it.
+                if method != "GET":
+                    break
+            except ValueError:
+                error = PaymentGatewayError("Paystack returned an invalid response")
+                break
+            except requests.RequestException as exc:
+                # Invalid URL, too many redirects and the like: retrying won't help.
+                error = PaymentGatewayError(f"Paystack request failed: {exc}")
+                break
+            if attempt < self.max_retries:
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+        raise error
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_paystack_client():
+    """Process-wide client, configured from ``PAYSTACK_*`` settings."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PaystackClient(
+                    settings.PAYSTACK_SECRET_KEY,
+                    base_url=getattr(settings, "PAYSTACK_BASE_URL", "https://api.paystack.co"),
+                    timeout=(
+                        getattr(settings, "PAYSTACK_CONNECT_TIMEOUT", 3.05),
+                        getattr(settings, "PAYSTACK_READ_TIMEOUT", 10),
+                    ),
+                    max_retries=getattr(settings, "PAYSTACK_MAX_RETRIES", 2),
+                )
+    return _client
+
+
+def sign_webhook(body, secret_key=None):
+    """HMAC-SHA512 of the raw body, as Paystack sends in X-Paystack-Signature."""
+    key = (secret_key or settings.PAYSTACK_SECRET_KEY).encode()
+    return hmac.new(key, body, hashlib.sha512).hexdigest()
+
+
+def verify_webhook_signature(body, signature):
+    return bool(signature) and hmac.compare_digest(sign_webhook(body), signature)
@@ -0,0 +1,113 @@
+"""
+In-process fake of the Paystack endpoints the app uses, for offline
+development and load tests. Point ``PAYSTACK_BASE_URL`` at it.
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_verify_path = re.compile(r"^/transaction/verify/(?P<reference>[\w-]+)$")
+
+
+class PaystackStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real gateway
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def simulate(self):
+        """Apply latency and random failures. Returns False if the request failed."""
+        stub = self.server
+        if stub.latency:
+            time.sleep(stub.latency)
+        if stub.failure_rate and random.random() < stub.failure_rate:
+            self.send_json(503, {"status": False, "message": "Service unavailable"})
+            return False
+        return True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path != "/transaction/initialize":
+            return self.send_json(404, {"status": False, "message": "Not found"})
+        if not self.simulate():
+            return
+        reference = uuid.uuid4().hex
+        with self.server.lock:
+            self.server.transactions[reference] = {
+                "reference": reference,
+                "amount": payload.get("amount"),
+                "email": payload.get("email"),
+                "metadata": payload.get("metadata") or {},
+                "status": self.server.outcome,
+            }
+        self.send_json(200, {
+            "status": True,
+            "message": "Authorization URL created",
+            "data": {
+                "authorization_url": f"http://{self.server.server_address[0]}:{self.server.server_port}/checkout/{reference}",
+                "access_code": reference[:12],
+                "reference": reference,
+            },
+        })
+
+    def do_GET(self):
+        match = _verify_path.match(self.path)
+        if not match:
+            return self.send_json(404, {"status": False, "message": "Not found"})
+        if not self.simulate():
+            return
+        with self.server.lock:
+            transaction = self.server.transactions.get(match["reference"])
+        if transaction is None:
+            return self.send_json(404, {"status": False, "message": "Transaction reference not found"})
+        self.send_json(200, {"status": True, "message": "Verification successful", "data": transaction})
+
+
+class PaystackStub(ThreadingHTTPServer):
+    """
+    ``latency`` (seconds) is added to every call, ``failure_rate`` of calls
+    answer 503, and initialized transactions verify with status ``outcome``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, failure_rate=0.0, outcome="success"):
+        super().__init__((host, port), PaystackStubHandler)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.outcome = outcome
+        self.transactions = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_port}"
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -1,31 +1,103 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
+from marketplace.serializers import EagerLoadingMixin, SparseFieldsMixin
 from .models import Order, OrderItem,Payment,ShippingAddress
-from listings.serializers import ProductSerializer
 
 
-class ShippingAddressSerializer(serializers.ModelSerializer):
+class ShippingAddressSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ShippingAddress
         fields = ["id", "user", "order", "address", "city", "postal_code", "country", "created_at"]
         read_only_fields = ["user", "order", "created_at"]
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
-    product = ProductSerializer(read_only=True)
+class OrderItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Renders an item from its snapshot columns only (no listings joins)."""
+    product = serializers.SerializerMethodField()
+    variant = serializers.SerializerMethodField()
+    projection_fields = {
+        "product": ["product", "product_name", "product_slug", "product_image"],
+        "variant": ["variant", "variant_name"],
+    }
 
     class Meta:
         model = OrderItem
-        fields = ["id", "product", "quantity", "price"]
+        fields = ["id", "product", "variant", "quantity", "price"]
 
-class OrderSerializer(serializers.ModelSerializer):
+    def get_product(self, item):
+        return {
+            "id": item.product_id,
+            "name": item.product_name,
+            "slug": item.product_slug,
+            "image": self.get_image(item),
+        }
+
+    def get_variant(self, item):
+        if not item.variant_name:
+            return None
+        return {"id": item.variant_id, "name": item.variant_name}
+
+    def get_image(self, item):
+        if not item.product_image:
+            return None
+        url = default_storage.url(item.product_image)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+class OrderSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
+    select_related_fields = ("shipping_address",)
+    prefetch_related_fields = ("items",)
     shipping_address = ShippingAddressSerializer(read_only=True)
 
     class Meta:
         model = Order
-        fields = ["id", "user", "status", "total_price", "created_at", "updated_at", "items"," shipping_address"]
+        fields = ["id", "user", "status", "total_price", "created_at", "updated_at", "items", "shipping_address"]
         read_only_fields = ["user", "total_price", "status", "created_at", "shipping_address"]
-class PaymentSerializer(serializers.ModelSerializer):
+
+
+class OrderHistoryShippingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ShippingAddress
+        fields = ["address", "city", "postal_code", "country"]
+
+
+class OrderHistorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Lean order listing: compact item lines and shipping address. Load the
+    queryset with ``narrow_queryset()`` so a page takes a fixed number of
+    queries.
+    """
+    items = OrderItemSerializer(many=True, read_only=True)
+    shipping_address = OrderHistoryShippingSerializer(read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ["id", "status", "total_price", "created_at", "items", "shipping_address"]
+
+
+class OrderHistoryFilterSerializer(serializers.Serializer):
+    """Query parameters accepted by the order history endpoint."""
+    status = serializers.ListField(
+        child=serializers.ChoiceField(choices=Order.STATUS_CHOICES), required=False
+    )
+    created_after = serializers.DateField(required=False)
+    created_before = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if "created_after" in data and "created_before" in data and data["created_after"] > data["created_before"]:
+            raise serializers.ValidationError("created_after must not be later than created_before.")
+        return data
+
+
+class OrderLineSerializer(serializers.Serializer):
+    """Validates one line of a create-order payload (no database access)."""
+    product_id = serializers.IntegerField(min_value=1)
+    variant_id = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class PaymentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Payment
         fields = ["id", "order", "reference", "amount", "status", "created_at"]
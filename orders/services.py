@@ -0,0 +1,129 @@
+from django.db import transaction
+
+from listings.models import Product, ProductImage, ProductVariant
+from listings.stock import reserve_stock
+from .models import Order, OrderItem, Payment
+from .notifications import queue_notification
+
+
+class UnknownProducts(Exception):
+    def __init__(self, product_ids, variant_ids):
+        self.product_ids = product_ids
+        self.variant_ids = variant_ids
+        parts = []
+        if product_ids:
+            parts.append(f"products {', '.join(map(str, product_ids))}")
+        if variant_ids:
+            parts.append(f"variants {', '.join(map(str, variant_ids))}")
+        super().__init__(f"Unknown {' and '.join(parts)}")
+
+
+def line_price(product, variant):
+    return variant.price if variant is not None else product.price
+
+
+def primary_images(product_ids):
+    """Product id -> storage path of its first image, in one query."""
+    images = (
+        ProductImage.objects.filter(product_id__in=product_ids)
+        .order_by("product_id", "-id")
+        .values_list("product_id", "image")
+    )
+    return dict(images)  # descending ids, so the first image wins
+
+
+def snapshot_item(order, product, variant, quantity, image=""):
+    """An unsaved OrderItem carrying the product as it is right now."""
+    return OrderItem(
+        order=order,
+        product=product,
+        variant=variant,
+        quantity=quantity,
+        price=line_price(product, variant),
+        product_name=product.name,
+        product_slug=product.slug,
+        variant_name=variant.name if variant is not None else "",
+        product_image=image,
+    )
+
+
+def resolve_lines(items):
+    """
+    Turn validated ``OrderLineSerializer`` data into ``(product, variant,
+    quantity)`` lines with one query for products and one for variants.
+    Raises UnknownProducts listing every id that does not exist.
+    """
+    products = Product.objects.in_bulk({item["product_id"] for item in items})
+    variant_ids = {item["variant_id"] for item in items if item.get("variant_id")}
+    variants = ProductVariant.objects.in_bulk(variant_ids) if variant_ids else {}
+
+    missing_products = sorted({item["product_id"] for item in items} - products.keys())
+    # A variant id that belongs to another product counts as unknown.
+    missing_variants = sorted({
+        item["variant_id"] for item in items
+        if item.get("variant_id")
+        and getattr(variants.get(item["variant_id"]), "product_id", None) != item["product_id"]
+    })
+    if missing_products or missing_variants:
+        raise UnknownProducts(missing_products, missing_variants)
+
+    return [
+        (products[item["product_id"]], variants.get(item.get("variant_id")), item["quantity"])
+        for item in items
+    ]
+
+
+def place_order(user, lines, reserve=True):
+    """
+    Create an order for ``lines`` (``(product, variant, quantity)`` tuples)
+    in one transaction: stock is reserved, the items are bulk inserted with a
+    snapshot of their product and the total is computed in the same pass. Raises
+    ``listings.stock.InsufficientStock`` with nothing written if any line
+    cannot be fulfilled. ``reserve=False`` skips the stock reservation.
+    """
+    lines = list(lines)
+    with transaction.atomic():
+        if reserve:
+            reserve_stock(lines)
+        total_price = sum(line_price(product, variant) * quantity for product, variant, quantity in lines)
+        order = Order.objects.create(user_id=user.pk, total_price=total_price)
+        images = primary_images({product.pk for product, _, _ in lines})
+        OrderItem.objects.bulk_create([
+            snapshot_item(order, product, variant, quantity, images.get(product.pk, ""))
+            for product, variant, quantity in lines
+        ])
+    return order
+
+
+def confirm_payment(reference, status="success"):
+    """
+    Record the gateway's final ``status`` ("success" or "failed") for a
+    payment. The Payment and Order rows and the customer email are written in
+    one transaction, and only the first confirmation of a reference does any
+    of it, so replayed or concurrent deliveries are no-ops. Returns whether
+    this call applied the change; raises Payment.DoesNotExist for unknown
+    references.
+    """
+    with transaction.atomic():
+        # Conditional UPDATE first: it takes the write lock and decides the winner.
+        applied = Payment.objects.filter(reference=reference, status="pending").update(status=status)
+        if not applied:
+            Payment.objects.only("pk").get(reference=reference)
+            return False
+        payment = Payment.objects.select_related("order__user").get(reference=reference)
+        order = payment.order
+        if status == "success":
+            order.status = "completed"
+            order.save(update_fields=["status", "updated_at"])
+            queue_notification(
+                order.user.email,
+                "Payment Successful",
+                f"Your order #{order.id} has been paid successfully.",
+            )
+        else:
+            queue_notification(
+                order.user.email,
+                "Payment Failed",
+                f"Payment for your order #{order.id} did not go through.",
+            )
+    return True
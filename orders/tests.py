@@ -1,3 +1,227 @@
-from django.test import TestCase
+import json
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.db.models import Sum
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from listings.models import Product, ProductVariant
+from listings.stock import InsufficientStock
+from .models import Notification, Order, OrderItem, Payment, ShippingAddress
+from .notifications import (
+    LEASE, MAX_ATTEMPTS, claim_batch, close_mail_connection, deliver_batch, queue_notification, retry_delay,
+)
+from .payments import sign_webhook
+from .services import place_order
+
+
+class OrderListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = User.objects.create_user(email="buyer@example.com", password=None)
+        product = Product.objects.create(seller=cls.buyer, name="Lamp", price=10, stock=5)
+        orders = Order.objects.bulk_create([Order(user=cls.buyer, total_price=20) for _ in range(60)])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, price=10, product_name="Lamp", product_slug=product.slug)
+            for order in orders for _ in range(2)
+        ])
+        ShippingAddress.objects.bulk_create([
+            ShippingAddress(user=cls.buyer, order=order, address="1 Road", city="Lagos", postal_code="100001", country="NG")
+            for order in orders
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def test_queries_do_not_grow_with_page_size(self):
+        # COUNT, the page joined to its shipping address, and the items.
+        for page_size in (5, 50):
+            with self.subTest(page_size=page_size), self.assertNumQueries(3):
+                response = self.client.get(reverse("order-list"), {"page_size": page_size})
+            self.assertEqual(len(response.data["results"]), page_size)
+            self.assertEqual(len(response.data["results"][0]["items"]), 2)
+            self.assertEqual(response.data["results"][0]["shipping_address"]["city"], "Lagos")
+
+
+class StockReservationTests(TestCase):
+    def test_error_names_only_the_short_lines(self):
+        seller = User.objects.create_user(email="seller@example.com", password=None)
+        a = Product.objects.create(seller=seller, name="A", price=1, stock=5)
+        b = Product.objects.create(seller=seller, name="B", price=1, stock=1)
+        with self.assertRaisesMessage(InsufficientStock, "Not enough stock for B") as caught:
+            place_order(seller, [(a, None, 3), (b, None, 2)])
+        self.assertEqual(caught.exception.names, ["B"])
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.stock, b.stock), (5, 1))
+
+
+class CheckoutConcurrencyTests(TransactionTestCase):
+    threads = 8
+    stock = 30
+
+    def test_concurrent_checkouts_never_oversell(self):
+        buyer = User.objects.create_user(email="buyer@example.com", password=None)
+        product = Product.objects.create(seller=buyer, name="Lamp", price=1, stock=self.stock)
+        variant = ProductVariant.objects.create(product=product, name="Red", price=2, stock=self.stock)
+        start = threading.Barrier(self.threads)
+        errors = []
+
+        def worker(index):
+            # Plain product lines, variant lines and both.
+            lines = [
+                [(product, None, 2)],
+                [(product, variant, 2)],
+                [(product, None, 2), (product, variant, 2)],
+            ][index % 3]
+            start.wait()
+            try:
+                while True:
+                    try:
+                        place_order(buyer, lines)
+                    except InsufficientStock:
+                        return
+                    except OperationalError:
+                        pass  # lock timeout: try again
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(self.threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        product.refresh_from_db()
+        variant.refresh_from_db()
+        sold_product = OrderItem.objects.filter(product=product, variant=None).aggregate(n=Sum("quantity"))["n"]
+        sold_variant = OrderItem.objects.filter(variant=variant).aggregate(n=Sum("quantity"))["n"]
+        self.assertEqual(sold_product + product.stock, self.stock)
+        self.assertEqual(sold_variant + variant.stock, self.stock)
+        self.assertGreaterEqual(product.stock, 0)
+        self.assertGreaterEqual(variant.stock, 0)
+
+
+class PaystackWebhookTests(TransactionTestCase):
+    def setUp(self):
+        buyer = User.objects.create_user(email="buyer@example.com", password=None)
+        self.order = Order.objects.create(user=buyer, total_price=20)
+        Payment.objects.create(order=self.order, reference="ref-1", amount=20)
+
+    def post(self, body, signature=None):
+        try:
+            return Client().post(
+                reverse("paystack-webhook"), data=body, content_type="application/json",
+                HTTP_X_PAYSTACK_SIGNATURE=sign_webhook(body) if signature is None else signature,
+            )
+        finally:
+            connection.close()
+
+    def test_replayed_deliveries_are_processed_once(self):
+        body = json.dumps({"event": "charge.success", "data": {"reference": "ref-1"}}).encode()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(self.post, [body] * 16))
+
+        outcomes = Counter((response.status_code, response.json()["status"]) for response in responses)
+        self.assertEqual(outcomes, {(200, "processed"): 1, (200, "duplicate"): 15})
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, "completed")
+        self.assertEqual(Payment.objects.get(reference="ref-1").status, "success")
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_rejects_bad_signatures_and_payloads(self):
+        body = json.dumps({"event": "charge.success", "data": {"reference": "ref-1"}}).encode()
+        self.assertEqual(self.post(body, signature="forged").status_code, 401)
+        for body in (b"[1]", b'"x"', b"{not json", b'{"event": "charge.success", "data": []}'):
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+        self.assertEqual(Payment.objects.get(reference="ref-1").status, "pending")
+
+    def test_unknown_references_are_ignored(self):
+        body = json.dumps({"event": "charge.success", "data": {"reference": "elsewhere"}}).encode()
+        response = self.post(body)
+        self.assertEqual((response.status_code, response.json()["status"]), (200, "ignored"))
+
+
+class NotificationOutboxTests(TestCase):
+    """The test runner swaps in the locmem email backend."""
+
+    def setUp(self):
+        close_mail_connection()
+        self.addCleanup(close_mail_connection)
+
+    def failing_backend(self):
+        return mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("SMTP server unreachable"),
+        )
+
+    def test_delivers_each_notification_exactly_once(self):
+        for n in range(3):
+            queue_notification(f"buyer{n}@example.com", "Payment Successful", f"Order #{n} paid.")
+        batch = claim_batch(10)
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(claim_batch(10), [])  # leased to the first worker
+
+        self.assertEqual(deliver_batch(batch), (3, 0))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f"buyer{n}@example.com" for n in range(3)])
+        self.assertEqual(set(Notification.objects.values_list("status", "attempts")), {("sent", 1)})
+        self.assertEqual(claim_batch(10), [])
+
+    def test_failed_sends_are_retried_with_backoff(self):
+        notification = queue_notification("buyer@example.com", "Payment Successful", "Paid.")
+        before = timezone.now()
+        with self.failing_backend():
+            self.assertEqual(deliver_batch(claim_batch(10)), (0, 1))
+
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ("pending", 1))
+        self.assertIn("SMTP server unreachable", notification.last_error)
+        self.assertGreaterEqual(notification.next_attempt_at, before + retry_delay(1))
+        self.assertEqual(claim_batch(10), [])  # not due until the backoff passes
+        self.assertEqual(retry_delay(2), 2 * retry_delay(1))
+
+        Notification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_batch(claim_batch(10)), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        notification = queue_notification("buyer@example.com", "Payment Successful", "Paid.")
+        Notification.objects.update(attempts=MAX_ATTEMPTS - 1)
+        with self.failing_backend():
+            self.assertEqual(deliver_batch(claim_batch(10)), (0, 1))
+
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ("failed", MAX_ATTEMPTS))
+        Notification.objects.update(next_attempt_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(claim_batch(10), [])
+        self.assertEqual(mail.outbox, [])
+
+    def test_expired_leases_are_claimed_again(self):
+        notification = queue_notification("buyer@example.com", "Payment Successful", "Paid.")
+        first = claim_batch(10)
+        self.assertEqual(claim_batch(10), [])
+
+        # The first worker died mid-send; once its lease runs out the row is due again.
+        later = timezone.now() + LEASE + timedelta(seconds=1)
+        with mock.patch("orders.notifications.timezone.now", return_value=later):
+            second = claim_batch(10)
+        self.assertEqual([n.pk for n in second], [notification.pk])
+        self.assertNotEqual(second[0].claimed_by, first[0].claimed_by)
+        self.assertEqual(deliver_batch(second), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
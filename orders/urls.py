@@ -7,5 +7,6 @@ urlpatterns = [
     path("<int:order_id>/", views.order_detail, name="order-detail"),
     path("<int:order_id>/pay/", views.initialize_payment, name="initialize-payment"),
     path("verify/<str:reference>/", views.verify_payment, name="verify-payment"),
+    path("webhook/paystack/", views.paystack_webhook, name="paystack-webhook"),
 
 ]
@@ -1,11 +1,24 @@
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+import json
+from datetime import datetime, time, timedelta
+
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from .models import Order, OrderItem
-from listings.models import Product
-from .serializers import OrderSerializer, OrderItemSerializer,ShippingAddressSerializer
+from django.db import transaction
+from django.utils import timezone
+from marketplace.pagination import get_paginator
+from marketplace.serializers import sparse_options
+from .models import Order, Payment
+from .serializers import (
+    OrderSerializer, OrderItemSerializer, OrderLineSerializer, ShippingAddressSerializer,
+    OrderHistorySerializer, OrderHistoryFilterSerializer,
+)
+from .services import UnknownProducts, confirm_payment, place_order, resolve_lines
+from .notifications import queue_notification
+from .payments import PaymentGatewayError, get_paystack_client, verify_webhook_signature
 
 # ---------------------------
 # CREATE ORDER
@@ -22,37 +35,71 @@ def create_order(request):
     if not data:
         return Response({"error": "No items provided"}, status=status.HTTP_400_BAD_REQUEST)
 
-    order = Order.objects.create(user=user)
-    total_price = 0
-
-    for item in data:
-        product = get_object_or_404(Product, id=item["product_id"])
-        quantity = item.get("quantity", 1)
-        price = product.price * quantity
-        OrderItem.objects.create(order=order, product=product, quantity=quantity, price=product.price)
-        total_price += price
-
-    order.total_price = total_price
-    order.save()
+    # Validate every line before touching the database
+    lines = OrderLineSerializer(data=data, many=True)
+    if not lines.is_valid():
+        return Response({"items": lines.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        with transaction.atomic():
+            order = place_order(user, resolve_lines(lines.validated_data), reserve=False)
+            queue_notification(
+                user.email,
+                "Order Placed Successfully",
+                f"Your order #{order.id} has been placed. Total: ₦{order.total_price}",
+            )
+    except UnknownProducts as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
     serializer = OrderSerializer(order)
-    #sendmail
-    send_order_notification(
-    request.user.email,
-    "Order Placed Successfully",
-    f"Your order #{order.id} has been placed. Total: ₦{order.total_price}")
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
 # ---------------------------
 # LIST USER ORDERS
 # ---------------------------
+class OrderPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def list_orders(request):
-    orders = Order.objects.filter(user=request.user)
-    serializer = OrderSerializer(orders, many=True)
-    return Response(serializer.data)
+    """
+    Paginated order history, newest first.
+    Query params: ?status=<status> (repeatable), ?created_after=YYYY-MM-DD,
+    ?created_before=YYYY-MM-DD (both inclusive), ?page / ?page_size or
+    ?pagination=cursor.
+    """
+    filters = OrderHistoryFilterSerializer(data=request.query_params)
+    if not filters.is_valid():
+        return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+    params = filters.validated_data
+
+    orders = Order.objects.filter(user_id=request.user.pk)
+    if params.get("status"):
+        orders = orders.filter(status__in=params["status"])
+    if "created_after" in params:
+        orders = orders.filter(created_at__gte=_start_of_day(params["created_after"]))
+    if "created_before" in params:
+        orders = orders.filter(created_at__lt=_start_of_day(params["created_before"] + timedelta(days=1)))
+
+    # Page + shipping address, then the items' snapshot columns: 2 queries plus
+    # the count. ?fields= drops the joins/prefetches it leaves out.
+    sparse = sparse_options(request)
+    orders = OrderHistorySerializer(**sparse).narrow_queryset(orders, "created_at")
+    orders = orders.order_by("-created_at", "-id")
+
+    paginator = get_paginator(request, OrderPagination)
+    page = paginator.paginate_queryset(orders, request)
+    serializer = OrderHistorySerializer(page, many=True, **sparse)
+    return paginator.get_paginated_response(serializer.data)
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
 
 
 # ---------------------------
@@ -61,13 +108,17 @@ def list_orders(request):
 @api_view(["GET", "PUT", "DELETE"])
 @permission_classes([IsAuthenticated])
 def order_detail(request, order_id):
-    order = get_object_or_404(Order, id=order_id, user=request.user)
+    orders = Order.objects.filter(user_id=request.user.pk)
 
     if request.method == "GET":
-        serializer = OrderSerializer(order)
+        sparse = sparse_options(request)
+        order = get_object_or_404(OrderSerializer(**sparse).narrow_queryset(orders), id=order_id)
+        serializer = OrderSerializer(order, **sparse)
         return Response(serializer.data)
 
-    elif request.method == "PUT":
+    order = get_object_or_404(orders, id=order_id)
+
+    if request.method == "PUT":
         # Example: update status
         status_val = request.data.get("status")
         if status_val in dict(Order.STATUS_CHOICES).keys():
@@ -81,33 +132,22 @@ def order_detail(request, order_id):
         return Response({"success": "Order deleted"}, status=status.HTTP_204_NO_CONTENT)
 
 
-import requests
-from django.conf import settings
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
-from .models import Order, Payment
-from .serializers import PaymentSerializer
-
-PAYSTACK_SECRET_KEY = settings.PAYSTACK_SECRET_KEY
-
+# ---------------------------
+# PAYMENTS
+# ---------------------------
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def initialize_payment(request, order_id):
-    order = get_object_or_404(Order, id=order_id, user=request.user)
-
-    url = "https://api.paystack.co/transaction/initialize"
-    headers = {"Authorization": f"Bearer {PAYSTACK_SECRET_KEY}"}
-    data = {
-        "email": request.user.email,
-        "amount": int(order.total_price * 100),  # Paystack expects amount in kobo
-        "metadata": {"order_id": order.id}
-    }
+    order = get_object_or_404(Order, id=order_id, user_id=request.user.pk)
 
-    response = requests.post(url, json=data, headers=headers)
-    res_data = response.json()
+    try:
+        res_data = get_paystack_client().initialize_transaction(
+            request.user.email, order.total_price, {"order_id": order.id}
+        )
+    except PaymentGatewayError:
+        return Response({"error": "Payment gateway unavailable"}, status=status.HTTP_502_BAD_GATEWAY)
 
-    if res_data["status"]:
+    if res_data.get("status"):
         Payment.objects.update_or_create(
             order=order,
             defaults={"reference": res_data["data"]["reference"], "amount": order.total_price, "status": "pending"}
@@ -118,46 +158,61 @@ def initialize_payment(request, order_id):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def verify_payment(request, reference):
-    url = f"https://api.paystack.co/transaction/verify/{reference}"
-    headers = {"Authorization": f"Bearer {PAYSTACK_SECRET_KEY}"}
-    response = requests.get(url, headers=headers)
-    res_data = response.json()
-
-    if res_data["status"] and res_data["data"]["status"] == "success":
-        payment = get_object_or_404(Payment, reference=reference)
-        payment.status = "success"
-        payment.save()
-
-        order = payment.order
-        order.status = "completed"
-        order.save()
-        #send mail
-        send_order_notification(
-    request.user.email,
-    "Payment Successful",
-    f"Your order #{order.id} has been paid successfully.")
+    """
+    Report the payment status recorded from Paystack's webhook. No call is
+    made to the gateway; clients polling this endpoint only read local state.
+    """
+    payment = get_object_or_404(Payment, reference=reference, order__user_id=request.user.pk)
+
+    if payment.status == "success":
         return Response({"success": "Payment successful"})
+    if payment.status == "pending":
+        return Response({"status": "pending"}, status=status.HTTP_202_ACCEPTED)
     return Response({"error": "Payment verification failed"}, status=400)
 
 
+# Paystack event -> final Payment status
+WEBHOOK_EVENTS = {
+    "charge.success": "success",
+}
+
+
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def paystack_webhook(request):
+    """
+    Paystack calls this when a charge completes. The body is authenticated by
+    its HMAC signature; repeated deliveries of the same reference are no-ops.
+    """
+    body = request.body
+    if not verify_webhook_signature(body, request.headers.get("X-Paystack-Signature")):
+        return Response({"error": "Invalid signature"}, status=status.HTTP_401_UNAUTHORIZED)
+    try:
+        event = json.loads(body)
+    except ValueError:
+        event = None
+    if not isinstance(event, dict) or not isinstance(event.get("data"), dict):
+        return Response({"error": "Invalid payload"}, status=status.HTTP_400_BAD_REQUEST)
+
+    kind, reference = event.get("event"), event["data"].get("reference")
+    outcome = WEBHOOK_EVENTS.get(kind) if isinstance(kind, str) else None
+    if outcome is None or not isinstance(reference, str) or not reference:
+        return Response({"status": "ignored"})
+    try:
+        applied = confirm_payment(reference, outcome)
+    except Payment.DoesNotExist:
+        # Not ours (or already deleted); acknowledge so Paystack stops retrying.
+        return Response({"status": "ignored"})
+    return Response({"status": "processed" if applied else "duplicate"})
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def add_shipping_address(request, order_id):
-    order = get_object_or_404(Order, id=order_id, user=request.user)
+    order = get_object_or_404(Order, id=order_id, user_id=request.user.pk)
     serializer = ShippingAddressSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save(user=request.user, order=order)
+        serializer.save(user_id=request.user.pk, order=order)
         return Response(serializer.data, status=201)
     return Response(serializer.errors, status=400)
-
-
-from django.core.mail import send_mail
-
-def send_order_notification(user_email, subject, message):
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user_email],
-        fail_silently=False,
-    )